@@ -0,0 +1,361 @@
+'''Benchmark suite of the hot paths of the reactive core, with JSON output and baseline comparison.
+
+Usage:
+
+    python benchmarks/run.py [-k PATTERN] [--json RESULTS] [--baseline BASELINE] [--max-regression RATIO]
+    python benchmarks/run.py --soak [ITERATIONS]
+
+Every benchmark reports the best time of one operation over a few repeats. The results can be
+written to a JSON file with `--json`, and compared with the results of a previous run with
+`--baseline`: the exit status is 1 if any benchmark is slower than its baseline by more than
+`--max-regression` (0.2, i.e. 20% by default), so that upgrades can be gated on it.
+
+    python benchmarks/run.py --json baseline.json
+    # ... change the code ...
+    python benchmarks/run.py --baseline baseline.json
+
+`--soak` checks that the reactive objects and their deps are released instead: it creates, reads, writes and
+drops a reactive dict with a nested dict many times, and the exit status is 1 if the RSS (read from
+/proc/self/statm, so Linux only) grows after the allocator has warmed up.
+'''
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from reactivity import computed, deep_to_raw, deep_unref, effect, reactive, ref, watch
+from reactivity.computed import ComputedRef
+from reactivity.ref import Ref
+
+REPEAT = 5
+
+# name -> (setup, number), where the setup returns the operation to time, and the number is the number of times
+# the operation is run in each repeat.
+BENCHMARKS: Dict[str, Tuple[Callable[[], Callable[[], Any]], int]] = {}
+
+
+def benchmark(name: str, number: int) -> Callable[[Callable[[], Callable[[], Any]]], Callable[[], Callable[[], Any]]]:
+
+    def decorator(setup: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+        BENCHMARKS[name] = (setup, number)
+        return setup
+
+    return decorator
+
+
+def make_tree(size: int) -> Dict[str, Any]:
+    return {'items': [{'id': i, 'value': i, 'tags': ['foo', 'bar']} for i in range(size)]}
+
+
+@benchmark('ref.get', 100_000)
+def bench_ref_get() -> Callable[[], Any]:
+    r = ref(1)
+    return lambda: r.value
+
+
+@benchmark('ref.set', 100_000)
+def bench_ref_set() -> Callable[[], Any]:
+    r = ref(0)
+    counter = itertools.count()
+    return lambda: setattr(r, 'value', next(counter))
+
+
+@benchmark('dict.read', 100_000)
+def bench_dict_read() -> Callable[[], Any]:
+    d = reactive({'foo': 1})
+    return lambda: d['foo']
+
+
+@benchmark('dict.write', 100_000)
+def bench_dict_write() -> Callable[[], Any]:
+    d = reactive({'foo': 0})
+    counter = itertools.count()
+    return lambda: d.__setitem__('foo', next(counter))
+
+
+@benchmark('dict.read.tracked (1k keys)', 100)
+def bench_dict_read_tracked() -> Callable[[], Any]:
+    d = reactive({i: i for i in range(1_000)})
+    runner = effect(lambda: [d[i] for i in range(1_000)])
+    return runner.run
+
+
+@benchmark('list.read', 100_000)
+def bench_list_read() -> Callable[[], Any]:
+    lst = reactive([1, 2, 3])
+    return lambda: lst[1]
+
+
+@benchmark('list.write', 100_000)
+def bench_list_write() -> Callable[[], Any]:
+    lst = reactive([0, 0, 0])
+    counter = itertools.count()
+    return lambda: lst.__setitem__(1, next(counter))
+
+
+@benchmark('dict.get', 100_000)
+def bench_dict_get() -> Callable[[], Any]:
+    d = reactive({'foo': 1})
+    return lambda: d.get('foo')
+
+
+@benchmark('dict.read.nested', 100_000)
+def bench_dict_read_nested() -> Callable[[], Any]:
+    d = reactive({'nested': {'foo': 1}})
+    return lambda: d['nested']
+
+
+@benchmark('list.read.nested', 100_000)
+def bench_list_read_nested() -> Callable[[], Any]:
+    lst = reactive([1, [1]])
+    return lambda: lst[1]
+
+
+@benchmark('reactive (held dict)', 100_000)
+def bench_reactive_held() -> Callable[[], Any]:
+    nested = {'foo': 1}
+    # The proxy is held by the default argument, so it is found in the registry.
+    return lambda held=reactive(nested): reactive(nested)
+
+
+class Base:
+    x: int
+
+    @property
+    def doubled(self) -> int:
+        return self.x * 2
+
+
+class Point(Base):
+
+    def __init__(self) -> None:
+        self.x = 1
+        self.nested = {'x': 1}
+
+    def method(self) -> int:
+        return self.x
+
+
+def bench_object_read(name: str, raw: bool) -> Callable[[], Any]:
+    point = Point() if raw else reactive(Point())
+    return lambda: getattr(point, name)
+
+
+# The reads of the raw object are the reference for the overhead of the proxy.
+for name in ('x', 'nested', 'method', 'doubled'):
+    benchmark(f'object.read raw ({name})', 100_000)(lambda name=name: bench_object_read(name, True))
+    benchmark(f'object.read ({name})', 100_000)(lambda name=name: bench_object_read(name, False))
+
+
+def make_class() -> type:
+
+    def __init__(self: Any) -> None:
+        self.x = 1
+
+    def method(self: Any) -> int:
+        return self.x
+
+    return type('Model', (), {'__init__': __init__, 'method': method})
+
+
+# The proxy class of a user class is created when the first instance of the class is made reactive, so an
+# application with many classes pays for it on the request path.
+@benchmark('reactive.first_touch (new class)', 100)
+def bench_first_touch_class() -> Callable[[], Any]:
+    return lambda: reactive(make_class()())
+
+
+@benchmark('reactive.first_touch (dict)', 10_000)
+def bench_first_touch_dict() -> Callable[[], Any]:
+    return lambda: reactive({'x': 1})
+
+
+def bench_track(size: int, phase: str) -> Callable[[], Any]:
+    refs: List[Ref[int]] = [ref(i) for i in range(size)]
+
+    def read_all() -> None:
+        for r in refs:
+            r.value
+
+    if phase == 'first run':
+        # Tracks the deps for the first time.
+        return lambda: effect(read_all).stop()
+    runner = effect(read_all)
+    if phase == 're-run':
+        # Tracks the same deps again.
+        return runner.run
+    # Triggers the effect, which re-collects its deps.
+    counter = itertools.count()
+    return lambda: setattr(refs[0], 'value', -next(counter) - 1)
+
+
+for size in (10, 1_000, 100_000):
+    for phase in ('first run', 're-run', 'trigger'):
+        benchmark(f'track.{phase} ({size:,} deps)', max(1, 10_000 // size))(
+            lambda size=size, phase=phase: bench_track(size, phase))
+
+
+def bench_computed_chain(depth: int) -> Callable[[], Any]:
+    source = ref(0)
+    chain: List[ComputedRef[int]] = []
+    for _ in range(depth):
+        prev = chain[-1] if chain else source
+        chain.append(computed(lambda prev=prev: prev.value + 1))
+    last = chain[-1]
+    last.value
+
+    def update() -> Any:
+        source.value += 1
+        return last.value
+
+    return update
+
+
+for depth in (1, 10, 100):
+    benchmark(f'computed.chain (depth {depth})', 1_000 if depth < 100 else 100)(
+        lambda depth=depth: bench_computed_chain(depth))
+
+
+def bench_trigger_fan_out(size: int) -> Callable[[], Any]:
+    source = ref(0)
+    for _ in range(size):
+        effect(lambda: source.value)
+
+    def update() -> None:
+        source.value += 1
+
+    return update
+
+
+for size in (1, 100, 10_000, 100_000):
+    benchmark(f'trigger.fan_out ({size:,} effects)', max(1, 10_000 // size))(
+        lambda size=size: bench_trigger_fan_out(size))
+
+
+def bench_watch_deep(size: int) -> Callable[[], Any]:
+    state = reactive(make_tree(size))
+    watch(state, lambda *args: None, deep=True)
+    item = state['items'][size // 2]
+
+    def update() -> None:
+        item['value'] += 1
+
+    return update
+
+
+for size in (100, 10_000):
+    benchmark(f'watch.deep ({size:,} items)', max(1, 1_000 // size))(lambda size=size: bench_watch_deep(size))
+
+
+@benchmark('deep_to_raw (1k items)', 10)
+def bench_deep_to_raw() -> Callable[[], Any]:
+    state = reactive(make_tree(1_000))
+    return lambda: deep_to_raw(state)
+
+
+@benchmark('deep_unref (1k items)', 10)
+def bench_deep_unref() -> Callable[[], Any]:
+    state = make_tree(1_000)
+    for item in state['items']:
+        item['value'] = ref(item['value'])
+    return lambda: deep_unref(state)
+
+
+@benchmark('json.dumps (1k items)', 10)
+def bench_json_dumps() -> Callable[[], Any]:
+    state = reactive(make_tree(1_000))
+    return lambda: json.dumps(state)
+
+
+def get_rss() -> int:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def soak_once(i: int) -> None:
+    state: Dict[str, Any] = reactive({'count': i, 'nested': {'count': i}})
+    runner = effect(lambda: state['count'] + state['nested']['count'])
+    state['count'] += 1
+    state['nested']['count'] += 1
+    runner.stop()
+
+
+def soak(iterations: int, warmup_iterations: int = 50_000) -> bool:
+    '''Run the soak test, and return whether the RSS has stayed flat.'''
+    for i in range(warmup_iterations):
+        soak_once(i)
+    gc.collect()
+    rss_before = get_rss()
+    start = time.perf_counter()
+    for i in range(iterations):
+        soak_once(i)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    growth = get_rss() - rss_before
+    print(f'{iterations:,} iterations in {elapsed:.2f} s ({elapsed / iterations * 1e6:.2f} us/iteration) | '
+          f'RSS {rss_before / 2**20:.1f} MiB -> {(rss_before + growth) / 2**20:.1f} MiB ({growth / 2**20:+.1f} MiB)')
+    # The RSS may grow a bit because of the fragmentation of the allocator, but not with the number of iterations.
+    return growth < 16 * 2**20
+
+
+def run(pattern: str) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    for name, (setup, number) in BENCHMARKS.items():
+        if pattern not in name:
+            continue
+        operation = setup()
+        elapsed = min(timeit.repeat(operation, number=number, repeat=REPEAT)) / number
+        results[name] = elapsed * 1e9
+        print(f'{name:<36} {results[name]:14.1f} ns/op', flush=True)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], max_regression: float) -> bool:
+    '''Print the results compared with the baseline, and return whether none of them has regressed.'''
+    passed = True
+    print()
+    for name, elapsed in results.items():
+        if name not in baseline:
+            continue
+        ratio = elapsed / baseline[name]
+        regressed = ratio > 1 + max_regression
+        passed = passed and not regressed
+        print(f'{name:<36} {baseline[name]:14.1f} -> {elapsed:14.1f} ns/op ({ratio - 1:+7.1%})'
+              f'{"  REGRESSED" if regressed else ""}')
+    return passed
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of the reactive core.')
+    parser.add_argument('-k', dest='pattern', default='', help='only run the benchmarks whose names contain it')
+    parser.add_argument('--json', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results with this JSON file written by --json')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='the slowdown allowed by --baseline')
+    parser.add_argument('--soak', type=int, nargs='?', const=1_000_000, metavar='ITERATIONS',
+                        help='run the soak test instead of the benchmarks')
+    args = parser.parse_args(argv)
+
+    if args.soak is not None:
+        return 0 if soak(args.soak) else 1
+
+    results = run(args.pattern)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': platform.python_version(), 'results': results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        if not compare(results, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
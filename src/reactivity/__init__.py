@@ -1,10 +1,16 @@
 # pyright: reportMissingTypeStubs=false
 
 from reactivity.computed import ComputedRef, computed, is_computed_ref
-from reactivity.effect import ReactiveEffect, effect
+from reactivity.effect import (EffectScope, ReactiveEffect, batch, effect, effect_scope, flush_jobs, get_current_scope,
+                               next_tick, on_effect_run, on_scope_dispose, on_track, on_trigger, set_run_budget,
+                               use_asyncio_scheduler)
+from reactivity.graph import get_dependency_graph
+from reactivity.memory import memory_report
 from reactivity.patches import patch
-from reactivity.reactive import (deep_to_raw, is_reactive, mark_raw, reactive, to_raw)
-from reactivity.ref import Ref, deep_unref, is_ref, ref, unref
+from reactivity.profiling import disable_profiling, enable_profiling, stats
+from reactivity.reactive import (deep_to_raw, is_reactive, is_readonly, mark_raw, reactive, readonly, shallow_reactive,
+                                 shallow_readonly, to_raw)
+from reactivity.ref import Ref, deep_unref, is_ref, ref, shallow_ref, trigger_ref, unref
 from reactivity.watch import watch, watch_effect
 
 from .__version__ import __version__
@@ -17,11 +23,37 @@ markRaw = mark_raw
 deepUnref = deep_unref
 isRef = is_ref
 isComputedRef = is_computed_ref
+flushJobs = flush_jobs
+nextTick = next_tick
+useAsyncioScheduler = use_asyncio_scheduler
+effectScope = effect_scope
+getCurrentScope = get_current_scope
+onScopeDispose = on_scope_dispose
+shallowRef = shallow_ref
+shallowReactive = shallow_reactive
+triggerRef = trigger_ref
+shallowReadonly = shallow_readonly
+isReadonly = is_readonly
+onTrack = on_track
+onTrigger = on_trigger
+onEffectRun = on_effect_run
+enableProfiling = enable_profiling
+disableProfiling = disable_profiling
+getDependencyGraph = get_dependency_graph
+memoryReport = memory_report
+setRunBudget = set_run_budget
 
 patch()
 
 __all__ = [
     'effect', 'watch_effect', 'watchEffect', 'watch', 'reactive', 'ref', 'computed', 'is_reactive', 'is_ref', 'unref',
     'deep_unref', 'deepUnref', '__version__', 'to_raw', 'toRaw', 'deep_to_raw', 'deepToRaw', 'isReactive', 'isRef',
-    'mark_raw', 'markRaw', 'is_computed_ref', 'isComputedRef', 'Ref', 'ComputedRef', 'ReactiveEffect'
+    'mark_raw', 'markRaw', 'is_computed_ref', 'isComputedRef', 'Ref', 'ComputedRef', 'ReactiveEffect', 'batch',
+    'flush_jobs', 'flushJobs', 'next_tick', 'nextTick', 'use_asyncio_scheduler', 'useAsyncioScheduler', 'EffectScope',
+    'effect_scope', 'effectScope', 'get_current_scope', 'getCurrentScope', 'on_scope_dispose', 'onScopeDispose',
+    'shallow_ref', 'shallowRef', 'shallow_reactive', 'shallowReactive', 'trigger_ref', 'triggerRef', 'readonly',
+    'shallow_readonly', 'shallowReadonly', 'is_readonly', 'isReadonly', 'on_track', 'onTrack', 'on_trigger',
+    'onTrigger', 'on_effect_run', 'onEffectRun', 'enable_profiling', 'enableProfiling', 'disable_profiling',
+    'disableProfiling', 'stats', 'get_dependency_graph', 'getDependencyGraph', 'memory_report', 'memoryReport',
+    'set_run_budget', 'setRunBudget'
 ]
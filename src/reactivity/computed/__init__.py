@@ -1,10 +1,14 @@
 # pyright: reportMissingTypeStubs=false
 
-from typing import Any, Callable, Dict, Generic, Set, TypeVar, Union, cast
+from typing import Callable, Dict, Generic, TypeVar, Union, cast
 
 from reactivity.effect import ReactiveEffect
-from reactivity.flags import (FLAG_OF_COMPUTED_REF, FLAG_OF_READONLY, FLAG_OF_REF)
-from reactivity.ref import track_ref_value, trigger_ref_value
+from reactivity.effect.definations import EFFECT_KIND_COMPUTED
+from reactivity.effect.dep import Dep
+from reactivity.effect.utils import is_dirty, notify_effects
+from reactivity.equality import eq_equals
+from reactivity.flags import (FLAG_OF_COMPUTED_REF, FLAG_OF_READONLY, FLAG_OF_REF, REF_VALUE)
+from reactivity.ref import track_ref_value
 from reactivity.reactive.utils import reactive_reversed_class_map
 
 from .definitions import ComputedRef
@@ -13,39 +17,69 @@ from .utils import is_computed_ref  # pyright: ignore[reportUnusedImport]
 T = TypeVar('T')
 
 
+def has_changed(value: object, old_value: object) -> bool:
+    return not eq_equals(value, old_value)
+
+
 class ComputedRefImpl(Generic[T]):
     __value: Union[T, None]
-    deps: Dict[Union[str, int], Set[ReactiveEffect[Any]]]
+    deps: Dict[Union[str, int], Dep]
     effect: ReactiveEffect[T]
+    # Whether the sources may have changed since the value was computed.
     _dirty: bool
+    _evaluated: bool
     _cacheable: bool
 
     def __init__(self, getter: Callable[[], T]) -> None:
         self.__value = None
         self._dirty = True
+        self._evaluated = False
         self._cacheable = True
-        self.deps = {}
+        dep = Dep(self, self, REF_VALUE)
+        self.deps = {REF_VALUE: dep}
 
         def scheduler():
+            # Only mark the computed (and its subscribers) as possibly dirty. Whether the value has
+            # actually changed is found out lazily by `refresh()`.
             if not self._dirty:
                 self._dirty = True
-                trigger_ref_value(self)
+                notify_effects(dep)
 
         self.effect = ReactiveEffect(getter, scheduler)
+        self.effect.kind = EFFECT_KIND_COMPUTED
         self.effect.computed = self
         self.effect.active = self._cacheable
-        setattr(self, FLAG_OF_COMPUTED_REF, True)
-        setattr(self, FLAG_OF_REF, True)
-        setattr(self, FLAG_OF_READONLY, True)
 
     @property
     def value(self) -> T:
+        # Refresh before tracking, so the subscriber records the version of the refreshed value.
+        self.refresh()
         track_ref_value(self)
-        if self._dirty:
-            self._dirty = False
-            self.__value = self.effect.run()
         return cast(T, self.__value)
 
+    def refresh(self) -> None:
+        '''Re-compute the value if the sources have changed since it was computed.
+
+        The version of the computed is increased only if the new value is not equal to the old one,
+        so the subscribers do not re-run if the value is unchanged.
+        '''
+        if not self._dirty:
+            return
+        self._dirty = False
+        if self._evaluated and not is_dirty(self.effect):
+            return
+        old_value = self.__value
+        try:
+            self.__value = self.effect.run()
+        except BaseException:
+            # Evaluate again on the next read, even though the failed run has tracked the current versions.
+            self._dirty = True
+            self._evaluated = False
+            raise
+        if not self._evaluated or has_changed(self.__value, old_value):
+            self._evaluated = True
+            self.deps[REF_VALUE].version += 1
+
     def __str__(self) -> str:
         t = type(self.__value)
         if t in reactive_reversed_class_map:
@@ -53,6 +87,12 @@ class ComputedRefImpl(Generic[T]):
         return f'<ComputedRef[{t.__name__}] value={self.__value}>'
 
 
+# The flags are set on the class, so that checking them is a type lookup.
+setattr(ComputedRefImpl, FLAG_OF_COMPUTED_REF, True)
+setattr(ComputedRefImpl, FLAG_OF_REF, True)
+setattr(ComputedRefImpl, FLAG_OF_READONLY, True)
+
+
 def computed(getter: Callable[[], T]) -> ComputedRef[T]:
     result = ComputedRefImpl(getter)
     return cast(ComputedRef[T], result)
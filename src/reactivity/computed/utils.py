@@ -1,7 +1,8 @@
 # pyright: reportMissingTypeStubs=false
 
 from reactivity.flags import FLAG_OF_COMPUTED_REF
+from reactivity.utils import has_type_flag
 
 
 def is_computed_ref(obj: object) -> bool:
-    return hasattr(obj, FLAG_OF_COMPUTED_REF)
+    return has_type_flag(obj, FLAG_OF_COMPUTED_REF)
@@ -1,54 +1,163 @@
 # reactivity/effect.py
 
-from typing import Any, Callable, List, Set, TypeVar, Union
+from contextlib import ContextDecorator
+from typing import Any, Callable, Dict, List, Type, TypeVar, Union, overload
 
-from .definations import ReactiveEffectDef
-from .utils import cleanup_effect
-from .vars import active_effect_stack
+from .definations import EFFECT_KIND_EFFECT, ReactiveEffectDef
+from .dep import Dep, Link, epoch_counter
+from .hooks import call_effect_run_hooks, effect_run_hooks, on_effect_run, on_track, on_trigger
+from .scheduler import (FLUSH_SYNC, check_flush_mode, create_scheduler, flush_jobs, next_tick,
+                        use_asyncio_scheduler)
+from .scope import (EffectScope, effect_scope, get_current_scope, on_scope_dispose, record_effect_scope)
+from .utils import cleanup_effect, cleanup_stale_deps, end_batch, set_run_budget, start_batch
+from .vars import active_effect, effect_id_counter, live_effects
 
 T = TypeVar('T')
+F = TypeVar('F', bound=Callable[..., Any])
 
 
 class ReactiveEffect(ReactiveEffectDef[T]):
+    id: int
+    # `'effect'`, `'computed'` or `'watcher'`, set by the function creating the effect.
+    kind: str
     active: bool
     fn: Callable[[], T]
     scheduler: Union[Callable[[], None], None]
     computed: Union[Any, None]  # type: ComputedRefImpl[T]
-    deps: 'List[Set[ReactiveEffectDef[Any]]]'
+    deps: 'Dict[Dep, Link]'
+    epoch: int
+    scope: Union[EffectScope, None]
+    on_stop: Union[Callable[[], None], None]
+    track_hooks: Union[List[Callable[..., None]], None]
+    trigger_hooks: Union[List[Callable[..., None]], None]
+    run_hooks: Union[List[Callable[..., None]], None]
 
     def __init__(self, fn: Callable[[], T], scheduler: Union[Callable[[], None], None] = None) -> None:
+        self.id = next(effect_id_counter)
+        self.kind = EFFECT_KIND_EFFECT
         self.active = True
         self.fn = fn
         self.scheduler = scheduler
         self.computed = None
-        self.deps = []
+        self.deps = {}
+        self.epoch = 0
+        self.on_stop = None
+        self.track_hooks = None
+        self.trigger_hooks = None
+        self.run_hooks = None
+        self.scope = record_effect_scope(self)
+        live_effects.add(self)
 
     def run(self) -> T:
+        if effect_run_hooks or self.run_hooks:
+            call_effect_run_hooks(self)
         if not self.active:
             return self.fn()
+        # Re-collect the dependencies on every run, so that branches which are no longer
+        # reached stop triggering this effect. Every dep tracked by this run is stamped with
+        # the epoch of the run, and the links with an older stamp are removed afterwards,
+        # so the subscriptions that are still in use are kept as they are.
+        epoch = next(epoch_counter)
+        self.epoch = epoch
+        token = active_effect.set(self)
         try:
-            active_effect_stack.append(self)
             return self.fn()
         finally:
-            if active_effect_stack:
-                active_effect_stack.pop()
+            active_effect.reset(token)
+            cleanup_stale_deps(self, epoch)
+            # The effect may be stopped by itself while running.
+            if not self.active:
+                cleanup_effect(self)
 
     def stop(self) -> None:
         cleanup_effect(self)
+        if not self.active:
+            return
         self.active = False
+        if self.scope is not None:
+            self.scope.effects.pop(self, None)
+            self.scope = None
+        if self.on_stop is not None:
+            self.on_stop()
 
     def __call__(self) -> T:
         return self.run()
 
 
-def effect(update: Callable[[], T]) -> ReactiveEffect[T]:
+def effect(update: Callable[[], T], *, flush: str = FLUSH_SYNC) -> ReactiveEffect[T]:
+    '''
+    Run a function immediately, and re-run it when its dependencies change.
+
+    Args:
+        update: The function to run.
+
+    Keyword Args:
+        flush: When to re-run the function. `'sync'` runs it as soon as a dependency changes, `'pre'` and `'post'`
+            queue it until the jobs are flushed. Defaults to `'sync'`.
+
+    Returns:
+        The effect, which can be called to run it manually.
+    '''
+    check_flush_mode(flush, 'effect')
 
     def wrapper():
         e = ReactiveEffect(update)
+        if flush != FLUSH_SYNC:
+            e.scheduler = create_scheduler(e, flush)
         e.run()
         return e
 
     return wrapper()
 
 
-__all__ = ['effect', 'ReactiveEffect']
+class BatchContext(ContextDecorator):
+    '''A batch, which can be used as a context manager or a decorator, see `batch()`.'''
+
+    def __enter__(self) -> None:
+        start_batch()
+
+    def __exit__(self, exc_type: Union[Type[BaseException], None], exc_value: Union[BaseException, None],
+                 traceback: Any) -> None:
+        end_batch()
+
+
+@overload
+def batch() -> BatchContext:
+    ...
+
+
+@overload
+def batch(fn: F) -> F:
+    ...
+
+
+def batch(fn: Union[F, None] = None) -> Any:
+    '''
+    Defer the effects triggered inside the batch, and run each of them exactly once when the outermost batch ends.
+
+    Computed values are still up to date inside the batch. It can be used as a context manager or a decorator:
+
+        with batch():
+            state['a'] = 1
+            state['b'] = 2
+
+        @batch
+        def update():
+            ...
+
+    Args:
+        fn: The function to run in a batch. Defaults to None.
+
+    Returns:
+        A context manager (which is a decorator as well) if `fn` is None, otherwise the decorated function.
+    '''
+    if fn is None:
+        return BatchContext()
+    return BatchContext()(fn)
+
+
+__all__ = [
+    'effect', 'ReactiveEffect', 'batch', 'flush_jobs', 'next_tick', 'use_asyncio_scheduler', 'EffectScope',
+    'effect_scope', 'get_current_scope', 'on_scope_dispose', 'on_track', 'on_trigger', 'on_effect_run',
+    'set_run_budget'
+]
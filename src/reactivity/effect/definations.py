@@ -1,15 +1,33 @@
-from typing import (Any, Callable, Generic, List, Set, TypeVar, Union)
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Generic, List, TypeVar, Union)
+
+if TYPE_CHECKING:
+    from .dep import Dep, Link
+    from .scope import EffectScope
 
 T = TypeVar('T')
 
+# What an effect is created for, see `ReactiveEffect.kind`.
+EFFECT_KIND_EFFECT = 'effect'
+EFFECT_KIND_COMPUTED = 'computed'
+EFFECT_KIND_WATCHER = 'watcher'
+
 
 class ReactiveEffectDef(Generic[T]):
     '''Type differentiator only. Do not use directly.'''
+    id: int
+    kind: str
     active: bool
     fn: Callable[[], T]
     scheduler: Union[Callable[[], None], None]
     computed: Union[Any, None]  # type: ComputedRefImpl[T]
-    deps: 'List[Set[ReactiveEffectDef[Any]]]'
+    deps: 'Dict[Dep, Link]'
+    epoch: int
+    scope: 'Union[EffectScope, None]'
+    on_stop: Union[Callable[[], None], None]
+    # The hooks registered for this effect only, None until one is registered, see `reactivity.effect.hooks`.
+    track_hooks: Union[List[Callable[..., None]], None]
+    trigger_hooks: Union[List[Callable[..., None]], None]
+    run_hooks: Union[List[Callable[..., None]], None]
 
     def __init__(self, fn: Callable[[], T], scheduler: Union[Callable[[], None], None] = None) -> None:
         raise NotImplementedError('ReactiveEffectDef is a type differentiator only. Do not use directly.')
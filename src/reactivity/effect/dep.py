@@ -0,0 +1,66 @@
+from itertools import count
+from typing import Any, Dict, Union
+
+from .definations import ReactiveEffectDef
+
+# Every run of every effect gets a new, increasing epoch from this counter.
+epoch_counter = count(1)
+
+
+class Link:
+    '''A subscription of an effect to a dep.
+
+    The same link object is shared by both sides: it is stored in `dep.subs` keyed by the effect,
+    and in `effect.deps` keyed by the dep, so subscribing and unsubscribing are both O(1).
+
+    `epoch` is the epoch of the latest run of the effect which tracked the dep. After a run, the
+    links whose epoch is older than the run are stale and get removed.
+
+    `version` is the version of the dep when it was tracked. If the dep has a newer version,
+    the value read by the effect has changed since.
+    '''
+    __slots__ = ('dep', 'sub', 'epoch', 'version')
+
+    dep: 'Dep'
+    sub: ReactiveEffectDef[Any]
+    epoch: int
+    version: int
+
+    def __init__(self, dep: 'Dep', sub: ReactiveEffectDef[Any], epoch: int) -> None:
+        self.dep = dep
+        self.sub = sub
+        self.epoch = epoch
+        self.version = dep.version
+
+
+class Dep:
+    '''The subscribers of a reactive value.
+
+    `subs` keeps the insertion order, so effects are triggered in the order they subscribed.
+
+    `version` is increased every time the value changes. `computed` is the computed whose value
+    is represented by the dep, None for other deps.
+
+    `target` is the object owning the dep and `key` the key of the value in it. The dep keeps its target
+    alive, so a reactive object is not released (along with its deps) while an effect depends on it.
+    '''
+    __slots__ = ('subs', 'version', 'computed', 'target', 'key')
+
+    subs: 'Dict[ReactiveEffectDef[Any], Link]'
+    version: int
+    computed: Union[Any, None]  # type: ComputedRefImpl[Any]
+    target: Any
+    key: Any
+
+    def __init__(self, computed: Union[Any, None] = None, target: Any = None, key: Any = None) -> None:
+        self.subs = {}
+        self.version = 0
+        self.computed = computed
+        self.target = target
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f'<Dep key={self.key!r} subs={len(self.subs)} version={self.version}>'
+
+
+__all__ = ['Dep', 'Link', 'epoch_counter']
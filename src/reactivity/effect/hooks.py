@@ -0,0 +1,112 @@
+from typing import Any, Callable, List, Union
+
+from reactivity.env import DEBUG
+
+from .definations import ReactiveEffectDef
+from .dep import Dep
+
+# (effect, target, key), where the target is the reactive object, ref or computed, and the key is the item key,
+# the attribute name, or one of the special keys (e.g. `REACTIVITY_VALUE`, `ITERATE_KEY` or `REF_VALUE`).
+TrackHook = Callable[[ReactiveEffectDef[Any], Any, Any], None]
+TriggerHook = Callable[[ReactiveEffectDef[Any], Any, Any], None]
+EffectRunHook = Callable[[ReactiveEffectDef[Any]], None]
+
+# The hooks registered for all the effects. They are checked with a single truth test where the events happen, so
+# nothing else is paid for them while they are empty. The lists are mutated in place, as they are imported by name.
+# The hooks registered for a single effect are stored on the effect instead.
+track_hooks: List[TrackHook] = []
+trigger_hooks: List[TriggerHook] = []
+effect_run_hooks: List[EffectRunHook] = []
+
+
+def call_effect_hooks(hooks: List[Callable[..., None]], effect: ReactiveEffectDef[Any], *args: Any) -> None:
+    for hook in list(hooks):
+        hook(effect, *args)
+
+
+def call_track_hooks(dep: Dep, effect: ReactiveEffectDef[Any]) -> None:
+    call_effect_hooks(track_hooks, effect, dep.target, dep.key)
+    if effect.track_hooks:
+        call_effect_hooks(effect.track_hooks, effect, dep.target, dep.key)
+
+
+def call_trigger_hooks(dep: Dep) -> None:
+    '''Call the hooks registered for all the effects, the ones of each effect are called as the effect is notified.'''
+    for effect in list(dep.subs):
+        call_effect_hooks(trigger_hooks, effect, dep.target, dep.key)
+
+
+def call_effect_run_hooks(effect: ReactiveEffectDef[Any]) -> None:
+    call_effect_hooks(effect_run_hooks, effect)
+    if effect.run_hooks:
+        call_effect_hooks(effect.run_hooks, effect)
+
+
+def __register(hooks: List[Any], hook: Callable[..., None], effect: Union[ReactiveEffectDef[Any], None],
+               effect_hooks_name: str) -> Callable[[], None]:
+    if effect is not None:
+        # The hooks of an effect are only looked up when the effect is concerned, and released along with it.
+        effect_hooks: Union[List[Any], None] = getattr(effect, effect_hooks_name)
+        if effect_hooks is None:
+            effect_hooks = []
+            setattr(effect, effect_hooks_name, effect_hooks)
+        hooks = effect_hooks
+
+    def remove() -> None:
+        if hook in hooks:
+            hooks.remove(hook)
+
+    hooks.append(hook)
+    return remove
+
+
+def on_track(hook: TrackHook, effect: Union[ReactiveEffectDef[Any], None] = None) -> Callable[[], None]:
+    '''
+    Register a hook called when an effect tracks a reactive value.
+
+    Args:
+        hook: The hook, called with the effect, the target (the reactive object, ref or computed) and the key.
+        effect: Only call the hook for this effect. Defaults to None, which calls it for all the effects.
+
+    Returns:
+        A function removing the hook.
+    '''
+    return __register(track_hooks, hook, effect, 'track_hooks')
+
+
+def on_trigger(hook: TriggerHook, effect: Union[ReactiveEffectDef[Any], None] = None) -> Callable[[], None]:
+    '''
+    Register a hook called for each effect depending on a reactive value which is changed.
+
+    Args:
+        hook: The hook, called with the effect, the target (the reactive object, ref or computed) and the key.
+        effect: Only call the hook for this effect. Defaults to None, which calls it for all the effects.
+
+    Returns:
+        A function removing the hook.
+    '''
+    return __register(trigger_hooks, hook, effect, 'trigger_hooks')
+
+
+def on_effect_run(hook: EffectRunHook, effect: Union[ReactiveEffectDef[Any], None] = None) -> Callable[[], None]:
+    '''
+    Register a hook called when an effect (including the ones of computeds and watchers) starts running.
+
+    Args:
+        hook: The hook, called with the effect.
+        effect: Only call the hook for this effect. Defaults to None, which calls it for all the effects.
+
+    Returns:
+        A function removing the hook.
+    '''
+    return __register(effect_run_hooks, hook, effect, 'run_hooks')
+
+
+if DEBUG:
+    on_track(lambda effect, target, key: print(f'[Reactivity] track: effect={effect.id}, key={key!r}, '
+                                               f'target={type(target).__name__} at {hex(id(target))}'))
+    on_trigger(lambda effect, target, key: print(f'[Reactivity] trigger: effect={effect.id}, key={key!r}, '
+                                                 f'target={type(target).__name__} at {hex(id(target))}'))
+    on_effect_run(lambda effect: print(f'[Reactivity] run: effect={effect.id}'))
+
+__all__ = ['on_track', 'on_trigger', 'on_effect_run']
@@ -0,0 +1,210 @@
+import asyncio
+import sys
+import threading
+from typing import Any, Callable, Dict, Union
+
+from .definations import ReactiveEffectDef
+from .utils import check_run_budget
+
+FLUSH_SYNC = 'sync'
+FLUSH_PRE = 'pre'
+FLUSH_POST = 'post'
+
+flush_modes = (FLUSH_SYNC, FLUSH_PRE, FLUSH_POST)
+
+# Dicts are used as ordered sets, so every job is queued only once until it is flushed.
+# The queues are shared by the threads, so that any thread can flush the jobs queued by the others. The lock
+# guards taking the jobs out of a queue, so a job queued by another thread meanwhile is not cleared with them.
+pre_flush_jobs: 'Dict[ReactiveEffectDef[Any], None]' = {}
+post_flush_jobs: 'Dict[ReactiveEffectDef[Any], None]' = {}
+__jobs_lock = threading.Lock()
+
+
+class FlushState(threading.local):
+    '''Whether the thread is flushing the jobs, local to the thread, so a job calling `flush_jobs()` is a no-op.'''
+    is_flushing: bool
+
+    def __init__(self) -> None:
+        self.is_flushing = False
+
+
+__flush_state = FlushState()
+# Only one thread flushes at a time. Another thread calling `flush_jobs()` meanwhile waits for the flush in progress,
+# which may take its jobs out of the queues, before flushing the jobs left, so its jobs have run when it returns.
+__flush_lock = threading.Lock()
+
+__is_asyncio_scheduler_enabled = False
+# The future resolved by the flush scheduled on the event loop, None if no flush is scheduled.
+__pending_flush: 'Union[asyncio.Future[None], None]' = None
+# The loop of the pending flush, as `Future.get_loop()` is not available on Python 3.6.
+__pending_flush_loop: Union[asyncio.AbstractEventLoop, None] = None
+
+
+def check_flush_mode(flush: str, fn_name: str) -> None:
+    if flush not in flush_modes:
+        raise ValueError(f'Invalid flush option {flush!r} for {fn_name}(). It must be one of {flush_modes}.')
+
+
+def queue_job(job: ReactiveEffectDef[Any], flush: str) -> None:
+    '''Queue an effect to be run by the next `flush_jobs()`.'''
+    if flush == FLUSH_PRE:
+        queue = pre_flush_jobs
+    elif flush == FLUSH_POST:
+        queue = post_flush_jobs
+    else:
+        raise ValueError(f'Invalid flush mode: {flush!r}. It must be one of {flush_modes}.')
+    with __jobs_lock:
+        queue[job] = None
+    if __is_asyncio_scheduler_enabled:
+        __queue_flush()
+
+
+def create_scheduler(job: ReactiveEffectDef[Any], flush: str) -> Callable[[], None]:
+    '''Create the scheduler of an effect, which queues the effect instead of running it.'''
+
+    def scheduler() -> None:
+        queue_job(job, flush)
+
+    return scheduler
+
+
+def has_pending_jobs() -> bool:
+    return bool(pre_flush_jobs or post_flush_jobs)
+
+
+def __run_jobs(queue: 'Dict[ReactiveEffectDef[Any], None]',
+               runs: 'Dict[ReactiveEffectDef[Any], int]') -> Union[BaseException, None]:
+    with __jobs_lock:
+        jobs = list(queue)
+        queue.clear()
+    # Jobs run in the order the effects were created, e.g. a parent watcher before its children.
+    jobs.sort(key=lambda job: job.id)
+    error: Union[BaseException, None] = None
+    for job in jobs:
+        # The job may be stopped by another job of this flush.
+        if not job.active:
+            continue
+        if not check_run_budget(job, runs):
+            continue
+        try:
+            job.run()
+        except BaseException as e:
+            if error is None:
+                error = e
+    return error
+
+
+def flush_jobs() -> None:
+    '''
+    Run the queued `pre` jobs and then the queued `post` jobs, each of them once.
+
+    The jobs queued while flushing are run by the same flush. If another thread is flushing, this waits for it to
+    finish first. If a job raises, the remaining jobs are still run, and the first exception is re-raised afterwards.
+    '''
+    state = __flush_state
+    if state.is_flushing:
+        return
+    error: Union[BaseException, None] = None
+    runs: 'Dict[ReactiveEffectDef[Any], int]' = {}
+    with __flush_lock:
+        state.is_flushing = True
+        try:
+            while pre_flush_jobs or post_flush_jobs:
+                queue = pre_flush_jobs if pre_flush_jobs else post_flush_jobs
+                queue_error = __run_jobs(queue, runs)
+                if error is None:
+                    error = queue_error
+        finally:
+            state.is_flushing = False
+    if error is not None:
+        raise error
+
+
+if sys.version_info >= (3, 7):
+
+    def __get_running_loop() -> Union[asyncio.AbstractEventLoop, None]:
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+else:
+
+    def __get_running_loop() -> Union[asyncio.AbstractEventLoop, None]:
+        # `asyncio.get_event_loop()` returns the running loop if there is one, otherwise the loop of the thread
+        # (creating it in the main thread), which is not running.
+        try:
+            loop = asyncio.get_event_loop()
+        except RuntimeError:
+            return None
+        return loop if loop.is_running() else None
+
+
+def __queue_flush() -> Union['asyncio.Future[None]', None]:
+    '''Schedule a flush on the running event loop, unless there is already one.'''
+    global __pending_flush, __pending_flush_loop
+    loop = __get_running_loop()
+    # Without a running loop, the jobs wait for `flush_jobs()` or the next `next_tick()`.
+    if loop is None:
+        return None
+    # A flush scheduled on another loop (e.g. a loop closed before running it) is ignored.
+    if __pending_flush is not None and __pending_flush_loop is loop:
+        return __pending_flush
+    future: 'asyncio.Future[None]' = loop.create_future()
+    __pending_flush = future
+    __pending_flush_loop = loop
+    loop.call_soon(__flush_on_loop, future)  # pyright: ignore[reportUnknownMemberType]
+    return future
+
+
+def __flush_on_loop(future: 'asyncio.Future[None]') -> None:
+    global __pending_flush, __pending_flush_loop
+    try:
+        flush_jobs()
+    except Exception as e:
+        # The exception is raised by the awaiting `next_tick()`, or reported by the loop if nobody awaits it.
+        if not future.done():
+            future.set_exception(e)
+    else:
+        if not future.done():
+            future.set_result(None)
+    finally:
+        __pending_flush = None
+        __pending_flush_loop = None
+
+
+def use_asyncio_scheduler(enabled: bool = True) -> None:
+    '''
+    Flush the queued jobs on the running asyncio event loop.
+
+    When enabled, queueing a job (e.g. triggering a watcher with `flush='pre'` or `flush='post'`) from a thread
+    running an event loop schedules `flush_jobs()` with `loop.call_soon()`. So all the writes made before the
+    current coroutine yields result in a single flush. Use `await next_tick()` to wait for it.
+
+    Args:
+        enabled: Whether to enable the asyncio scheduler. Defaults to True.
+    '''
+    global __is_asyncio_scheduler_enabled
+    __is_asyncio_scheduler_enabled = enabled
+    if enabled and has_pending_jobs():
+        __queue_flush()
+
+
+async def next_tick() -> None:
+    '''
+    Wait for the queued jobs to be flushed.
+
+    If the asyncio scheduler is enabled and there are queued jobs, this waits for the flush scheduled on the
+    event loop (scheduling it if needed). Otherwise, the queued jobs are flushed right away.
+    '''
+    if __is_asyncio_scheduler_enabled:
+        future = __queue_flush() if has_pending_jobs() else __pending_flush
+        if future is not None:
+            await future
+            return
+    flush_jobs()
+
+
+__all__ = [
+    'flush_jobs', 'queue_job', 'create_scheduler', 'check_flush_mode', 'has_pending_jobs', 'flush_modes',
+    'use_asyncio_scheduler', 'next_tick'
+]
@@ -0,0 +1,107 @@
+import warnings
+from typing import Any, Callable, Dict, List, TypeVar, Union
+
+from .definations import ReactiveEffectDef
+from .vars import active_scope, get_active_scope
+
+T = TypeVar('T')
+
+
+class EffectScope:
+    '''
+    Collect the effects (including the ones of computeds and watchers) created while running in the scope,
+    so that they can be disposed together.
+    '''
+    active: bool
+    parent: 'Union[EffectScope, None]'
+    # Dicts are used as ordered sets, so that an effect or a child scope stopped on its own leaves its scope in O(1).
+    effects: 'Dict[ReactiveEffectDef[Any], None]'
+    scopes: 'Dict[EffectScope, None]'
+    cleanups: List[Callable[[], None]]
+
+    def __init__(self, detached: bool = False) -> None:
+        self.active = True
+        self.effects = {}
+        self.scopes = {}
+        self.cleanups = []
+        self.parent = None
+        if not detached:
+            parent = get_active_scope()
+            if parent is not None:
+                self.parent = parent
+                parent.scopes[self] = None
+
+    def run(self, fn: Callable[[], T]) -> Union[T, None]:
+        '''Run a function in the scope, the effects created by it are collected by the scope.'''
+        if not self.active:
+            warnings.warn('Cannot run an inactive effect scope.', RuntimeWarning, stacklevel=2)
+            return None
+        token = active_scope.set(self)
+        try:
+            return fn()
+        finally:
+            active_scope.reset(token)
+
+    def stop(self) -> None:
+        '''Stop all the effects and child scopes of the scope, and run its cleanup callbacks.'''
+        if not self.active:
+            return
+        self.active = False
+        # Stopping an effect or a scope removes it from this scope, so iterate over copies.
+        for effect in list(self.effects):
+            effect.stop()
+        for cleanup in self.cleanups:
+            cleanup()
+        for scope in list(self.scopes):
+            scope.stop()
+        self.effects.clear()
+        self.cleanups.clear()
+        self.scopes.clear()
+        if self.parent is not None:
+            self.parent.scopes.pop(self, None)
+            self.parent = None
+
+
+def effect_scope(detached: bool = False) -> EffectScope:
+    '''
+    Create an effect scope.
+
+    The effects, computeds and watchers created inside `scope.run()` are collected by the scope, and
+    `scope.stop()` disposes all of them at once.
+
+    Args:
+        detached: Whether the scope is independent of the current scope. A scope created inside another
+            scope is stopped with it, unless it is detached. Defaults to False.
+
+    Returns:
+        The effect scope.
+    '''
+    return EffectScope(detached)
+
+
+def get_current_scope() -> Union[EffectScope, None]:
+    '''Return the active effect scope, None if there is none.'''
+    return get_active_scope()
+
+
+def on_scope_dispose(fn: Callable[[], None]) -> None:
+    '''Register a callback to be called when the active effect scope is stopped.'''
+    scope = get_active_scope()
+    if scope is None:
+        warnings.warn('on_scope_dispose() is called when there is no active effect scope to be associated with.',
+                      RuntimeWarning,
+                      stacklevel=2)
+        return
+    scope.cleanups.append(fn)
+
+
+def record_effect_scope(effect: ReactiveEffectDef[Any]) -> Union[EffectScope, None]:
+    '''Add an effect to the active effect scope, and return the scope.'''
+    scope = get_active_scope()
+    if scope is not None and scope.active:
+        scope.effects[effect] = None
+        return scope
+    return None
+
+
+__all__ = ['EffectScope', 'effect_scope', 'get_current_scope', 'on_scope_dispose', 'record_effect_scope']
@@ -1,36 +1,213 @@
-from typing import Any, Set
+import warnings
+from typing import Any, Dict, Sequence, Union
 
 from .definations import ReactiveEffectDef
-from .vars import active_effect_stack
+from .dep import Dep, Link
+from .hooks import call_effect_hooks, call_track_hooks, call_trigger_hooks, track_hooks, trigger_hooks
+from .vars import batch_state, get_active_effect
+
+# The maximum number of times an effect can run in a flush, None for no limit.
+__max_runs_per_flush: Union[int, None] = 100
 
 
 def cleanup_effect(effect: ReactiveEffectDef[Any]) -> None:
     if not effect.deps:
         return
     for dep in effect.deps:
-        dep.remove(effect)
+        del dep.subs[effect]
     effect.deps.clear()
 
 
-def track_effects(dep: Set[ReactiveEffectDef[Any]]):
-    active_effect = active_effect_stack[-1]
-    dep.add(active_effect)
-    if dep not in active_effect.deps:
-        active_effect.deps.append(dep)
+def cleanup_stale_deps(effect: ReactiveEffectDef[Any], epoch: int) -> None:
+    '''Unsubscribe the effect from the deps which were not tracked since the run of `epoch` started.'''
+    deps = effect.deps
+    stale_deps = [dep for dep, link in deps.items() if link.epoch < epoch]
+    for dep in stale_deps:
+        del dep.subs[effect]
+        del deps[dep]
+
+
+def track_effects(dep: Dep, active_effect: ReactiveEffectDef[Any]) -> None:
+    link = active_effect.deps.get(dep)
+    if link is None:
+        link = Link(dep, active_effect, active_effect.epoch)
+        active_effect.deps[dep] = link
+        dep.subs[active_effect] = link
+    else:
+        link.epoch = active_effect.epoch
+        link.version = dep.version
+    if track_hooks or active_effect.track_hooks:
+        call_track_hooks(dep, active_effect)
+
+
+def is_dirty(effect: ReactiveEffectDef[Any]) -> bool:
+    '''Check whether any value read by the last run of the effect has changed since.
+
+    The computeds read by the effect are refreshed first, and a computed only gets a new
+    version if its value is not equal to the previous one.
+    '''
+    for dep, link in effect.deps.items():
+        if dep.computed is not None:
+            dep.computed.refresh()
+        if dep.version != link.version:
+            return True
+    return False
 
 
-def trigger_effects(effects: Set[ReactiveEffectDef[Any]]):
-    effect_list = list(effects)
+def trigger_effects(dep: Dep) -> None:
+    '''Notify the subscribers of a dep whose value has changed.'''
+    dep.version += 1
+    notify_effects(dep)
+
+
+def notify_effects(dep: Dep) -> None:
+    '''Notify the subscribers of a dep whose value may have changed.'''
+    # Propagate the change in two phases, as if in a batch: first, the computeds depending on the dep
+    # (directly or through other computeds) are marked dirty, and the other effects are queued; then,
+    # the queued effects run, each of them once. Computeds are re-evaluated lazily when they are read,
+    # so the effects only observe values which are consistent with the change, e.g. in a diamond
+    # A -> (B, C) -> D, D runs once and reads the new values of both B and C.
+    if trigger_hooks:
+        call_trigger_hooks(dep)
+    effect_list = list(dep.subs)
+    # The running effect does not trigger itself, e.g. when it increases a counter which it reads, otherwise it
+    # would run again and again.
+    active_effect = get_active_effect()
+    if active_effect is not None and active_effect in dep.subs:
+        effect_list.remove(active_effect)
+    has_computed = False
     for effect in effect_list:
+        if effect.trigger_hooks:
+            call_effect_hooks(effect.trigger_hooks, effect, dep.target, dep.key)
         if effect.computed is not None:
-            trigger_effect(effect)
-    for effect in effect_list:
-        if effect.computed is None:
-            trigger_effect(effect)
+            has_computed = True
+    state = batch_state
+    if not has_computed and dep.computed is None and not state.depth and not state.is_flushing:
+        # Without computeds, there is nothing to propagate first, and the subscribers of the changed dep are dirty,
+        # so they are run directly, without queueing them and checking them again.
+        flush_batched_effects(effect_list)
+        return
+    start_batch()
+    try:
+        if has_computed:
+            for effect in effect_list:
+                if effect.computed is not None:
+                    trigger_effect(effect)
+        for effect in effect_list:
+            if effect.computed is None:
+                trigger_effect(effect)
+    finally:
+        end_batch()
 
 
 def trigger_effect(effect: ReactiveEffectDef[Any]) -> None:
+    # Computed effects only mark the computed as dirty and notify its subscribers,
+    # so they are never deferred. That keeps computed values fresh inside a batch.
+    if batch_state.depth and effect.computed is None:
+        batch_state.queue[effect] = None
+        return
     if effect.scheduler is None:
         effect.run()
     else:
         effect.scheduler()
+
+
+def start_batch() -> None:
+    batch_state.depth += 1
+
+
+def end_batch() -> None:
+    state = batch_state
+    state.depth -= 1
+    if not state.depth:
+        flush_batched_effects()
+
+
+def flush_batched_effects(triggered: 'Sequence[ReactiveEffectDef[Any]]' = ()) -> None:
+    '''Run the effects queued by batches, each of them exactly once.
+
+    The `triggered` effects are known to be dirty, and run first without being checked. The effects which they
+    trigger are queued, and run afterwards.
+
+    If an effect (or a computed read by it) raises, the remaining effects are still run, and the first exception is
+    re-raised afterwards.
+    '''
+    state = batch_state
+    # The effects triggered while flushing are run synchronously, so there is nothing to
+    # do if a flush is already in progress (e.g. a batch inside an effect).
+    if state.is_flushing:
+        return
+    state.is_flushing = True
+    queue = state.queue
+    error: Union[BaseException, None] = None
+    runs: 'Dict[ReactiveEffectDef[Any], int]' = {}
+    try:
+        for effect in triggered:
+            if not effect.active:
+                continue
+            try:
+                trigger_effect(effect)
+            except BaseException as e:
+                if error is None:
+                    error = e
+        if triggered and queue:
+            runs = dict.fromkeys(triggered, 1)
+        while queue:
+            effects = list(queue)
+            queue.clear()
+            for effect in effects:
+                # The effect may be stopped by another effect of this flush.
+                if not effect.active:
+                    continue
+                try:
+                    # The effect may only depend on computeds whose values turned out to be unchanged. Refreshing
+                    # them may raise, which is reported like an error of the effect itself.
+                    if not is_dirty(effect) or not check_run_budget(effect, runs):
+                        continue
+                    trigger_effect(effect)
+                except BaseException as e:
+                    if error is None:
+                        error = e
+    finally:
+        state.is_flushing = False
+    if error is not None:
+        raise error
+
+
+def check_run_budget(effect: ReactiveEffectDef[Any], runs: 'Dict[ReactiveEffectDef[Any], int]') -> bool:
+    '''Count a run of an effect in a flush, and return whether the effect can still run in the flush.
+
+    An effect running more times than the budget is most likely in a cycle, e.g. two effects changing the values
+    read by each other. It is reported once, along with the values which have changed since its last run, and its
+    extra runs are dropped.
+    '''
+    count = runs[effect] = runs.get(effect, 0) + 1
+    if __max_runs_per_flush is None or count <= __max_runs_per_flush:
+        return True
+    if count == __max_runs_per_flush + 1:
+        changed = ', '.join(f'{type(dep.target).__name__}[{dep.key!r}]' for dep, link in effect.deps.items()
+                            if dep.version != link.version)
+        name = getattr(effect.fn, '__qualname__', repr(effect.fn))
+        warnings.warn(
+            f'The effect {name} (id {effect.id}) is triggered more than {__max_runs_per_flush} times in a flush, '
+            f'probably by a cycle through {changed or "its dependencies"}. The extra runs are dropped.',
+            RuntimeWarning)
+    return False
+
+
+def set_run_budget(max_runs_per_flush: Union[int, None] = 100) -> None:
+    '''
+    Set the maximum number of times an effect (including the ones of watchers) can run in a flush, of a batch or of
+    `flush_jobs()`. The runs are counted per flush, so the flushes of different threads do not share the budget.
+
+    The extra runs of an effect exceeding the budget are dropped with a `RuntimeWarning`, which protects the
+    application from the effects triggering each other endlessly. The computeds are not counted, as they are only
+    marked dirty when their dependencies change, and re-evaluated once when they are read.
+
+    Args:
+        max_runs_per_flush: The budget, None for no limit. Defaults to 100.
+    '''
+    global __max_runs_per_flush
+    if max_runs_per_flush is not None and max_runs_per_flush < 1:
+        raise ValueError(f'The run budget must be a positive integer or None, got {max_runs_per_flush!r}.')
+    __max_runs_per_flush = max_runs_per_flush
@@ -1,5 +1,80 @@
-from collections import deque
-from typing import Any, Deque
+import sys
+import threading
+import weakref
+from itertools import count
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, TypeVar, Union, cast
+
 from .definations import ReactiveEffectDef
 
-active_effect_stack: 'Deque[ReactiveEffectDef[Any]]' = deque()
+if TYPE_CHECKING:
+    from .scope import EffectScope
+
+T = TypeVar('T')
+
+if sys.version_info >= (3, 7):
+    from contextvars import ContextVar
+else:
+
+    class ContextVar(Generic[T]):
+        '''A minimal substitute of `contextvars.ContextVar` backed by thread-local storage.'''
+        name: str
+        _default: T
+        _local: threading.local
+
+        def __init__(self, name: str, *, default: T) -> None:
+            self.name = name
+            self._default = default
+            self._local = threading.local()
+
+        def get(self) -> T:
+            return cast(T, getattr(self._local, 'value', self._default))
+
+        def set(self, value: T) -> T:
+            token = self.get()
+            self._local.value = value
+            return token
+
+        def reset(self, token: T) -> None:
+            self._local.value = token
+
+
+# The effect which is running, and tracks the reactive values read by it.
+# It is local to the thread and the asyncio task, so concurrent runs do not track into each other's effects.
+# The outer effects of nested runs are restored from the tokens returned by `set()`, so no stack is needed.
+active_effect: 'ContextVar[Union[ReactiveEffectDef[Any], None]]' = ContextVar('active_effect', default=None)
+get_active_effect = active_effect.get
+
+# The effect scope collecting the effects created in it, local to the thread and the asyncio task as well.
+active_scope: 'ContextVar[Union[EffectScope, None]]' = ContextVar('active_scope', default=None)
+get_active_scope: 'Callable[[], Union[EffectScope, None]]' = active_scope.get
+
+# Effects are identified by their creation order, which is the order the scheduler runs them.
+effect_id_counter = count()
+
+# The live effects, for introspecting the dependency graph. It does not keep them alive.
+live_effects: 'weakref.WeakSet[ReactiveEffectDef[Any]]' = weakref.WeakSet()
+
+
+
+class BatchState(threading.local):
+    '''
+    The state of the batches, local to the thread. The batches of concurrent threads are independent, so a thread
+    never flushes (or drops) the effects queued by another one.
+
+    The asyncio tasks of a thread share it, which is harmless, as a flush runs the effects synchronously.
+    '''
+    # The depth of the nested batches.
+    depth: int
+    # The effects triggered inside a batch, waiting to be flushed when the outermost batch ends.
+    # A dict is used as an ordered set, so every effect is queued only once.
+    queue: 'Dict[ReactiveEffectDef[Any], None]'
+    is_flushing: bool
+
+    def __init__(self) -> None:
+        # It is called once in every thread using the state.
+        self.depth = 0
+        self.queue = {}
+        self.is_flushing = False
+
+
+batch_state = BatchState()
@@ -0,0 +1,80 @@
+from typing import Any, Callable, Dict, Union
+
+# (new value, old value) -> whether they are equal, in which case the write triggers nothing.
+EqualsFunction = Callable[[Any, Any], bool]
+# One of the named strategies below, or a custom function.
+Equals = Union[str, EqualsFunction]
+
+EQUALS_IDENTITY = 'identity'
+EQUALS_EQ = 'eq'
+EQUALS_NEVER = 'never'
+
+# The containers which are compared by identity only by default, as comparing them with `==` walks all of their items.
+container_types = (list, dict, set, frozenset, tuple, bytearray)
+# The exact types of the values which are compared with `==` directly, as it is cheap and never raises for them.
+scalar_types = frozenset((type(None), int, float, complex, str, bytes, bool))
+
+# type -> whether it is a container type
+__container_type_cache: Dict[type, bool] = {}
+
+
+def identity_equals(value: Any, old_value: Any) -> bool:
+    return value is old_value
+
+
+def eq_equals(value: Any, old_value: Any) -> bool:
+    if value is old_value:
+        return True
+    try:
+        return bool(value == old_value)
+    except Exception:
+        # e.g. comparing arrays, whose results are ambiguous in a boolean context.
+        return False
+
+
+def never_equals(value: Any, old_value: Any) -> bool:
+    return False
+
+
+def default_equals(value: Any, old_value: Any) -> bool:
+    '''Compare the values by identity first, then with `==` unless one of them is a container.'''
+    if value is old_value:
+        return True
+    if type(value) in scalar_types and type(old_value) in scalar_types:
+        return value == old_value
+    for t in map(type, (value, old_value)):
+        is_container = __container_type_cache.get(t)
+        if is_container is None:
+            is_container = __container_type_cache[t] = issubclass(t, container_types)
+        if is_container:
+            return False
+    return eq_equals(value, old_value)
+
+
+equals_functions: Dict[str, EqualsFunction] = {
+    EQUALS_IDENTITY: identity_equals,
+    EQUALS_EQ: eq_equals,
+    EQUALS_NEVER: never_equals,
+}
+
+
+def get_equals_function(equals: Union[Equals, None], default: EqualsFunction = default_equals) -> EqualsFunction:
+    '''
+    Return the function of an equality strategy.
+
+    Args:
+        equals: `'identity'` (`is`), `'eq'` (`==`), `'never'` (every write triggers the effects), a function called
+            with the new and the old values and returning whether they are equal, or None for the default.
+        default: The function returned for None. Defaults to comparing by identity first, then with `==` unless one
+            of the values is a container.
+    '''
+    if equals is None:
+        return default
+    if isinstance(equals, str):
+        if equals not in equals_functions:
+            raise ValueError(f'The equality strategy must be one of {", ".join(map(repr, equals_functions))} '
+                             f'or a function, got {equals!r}.')
+        return equals_functions[equals]
+    if not callable(equals):
+        raise TypeError(f'The equality strategy must be a string or a function, got {type(equals).__name__}.')
+    return equals
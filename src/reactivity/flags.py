@@ -3,7 +3,13 @@ FLAG_OF_REF = '__IS_REF__'
 FLAG_OF_COMPUTED_REF = '__IS_COMPUTED_REF__'
 
 REACTIVITY_VALUE = '__REACTIVITY_VALUE__'
+ITERATE_KEY = '__REACTIVITY_ITERATE__'
+LENGTH_KEY = '__REACTIVITY_LENGTH__'
 FLAG_OF_REACTIVE = '__IS_REACTIVE__'
+RAW_OF_REACTIVE = '__REACTIVE_RAW__'
+DEPS_OF_REACTIVE = '__REACTIVE_DEPS__'
+EQUALS_OF_REACTIVE = '__REACTIVE_EQUALS__'
+CHILDREN_OF_REACTIVE = '__REACTIVE_CHILDREN__'
 
 FLAG_OF_SKIP = '__REACTIVE_SKIP__'
 
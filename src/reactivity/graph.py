@@ -0,0 +1,176 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+from reactivity.effect.dep import Dep
+from reactivity.effect.vars import live_effects
+from reactivity.flags import FLAG_OF_COMPUTED_REF, FLAG_OF_REF, REF_VALUE
+from reactivity.reactive.utils import reactive_reversed_class_map
+from reactivity.utils import get_type_flags
+
+
+class SourceNode:
+    '''A reactive value (a key of a reactive object, or the value of a ref or computed) with subscribers.'''
+    __slots__ = ('id', 'kind', 'type', 'target_id', 'key', 'fan_out')
+
+    id: str
+    # 'reactive', 'ref' or 'computed'
+    kind: str
+    # The name of the type of the reactive object (the original type), ref or computed.
+    type: str
+    # The id of the reactive object, ref or computed, so that the keys of the same object can be grouped.
+    target_id: int
+    key: str
+    # The number of effects depending on the value.
+    fan_out: int
+
+    def __init__(self, id: str, kind: str, type: str, target_id: int, key: str, fan_out: int) -> None:
+        self.id = id
+        self.kind = kind
+        self.type = type
+        self.target_id = target_id
+        self.key = key
+        self.fan_out = fan_out
+
+    def __repr__(self) -> str:
+        return f'<SourceNode {self.kind} {self.type}[{self.key}] fan_out={self.fan_out}>'
+
+
+class EffectNode:
+    '''An effect, which is the effect of a computed or watcher, or a plain effect.'''
+    __slots__ = ('id', 'kind', 'name', 'fan_in')
+
+    id: str
+    # 'effect', 'computed' or 'watcher'
+    kind: str
+    # The qualified name of the function run by the effect.
+    name: str
+    # The number of values the effect depends on.
+    fan_in: int
+
+    def __init__(self, id: str, kind: str, name: str, fan_in: int) -> None:
+        self.id = id
+        self.kind = kind
+        self.name = name
+        self.fan_in = fan_in
+
+    def __repr__(self) -> str:
+        return f'<EffectNode {self.kind} {self.name} fan_in={self.fan_in}>'
+
+
+class DependencyGraph:
+    '''
+    A snapshot of the live dependency graph. It holds no reference to the reactive values and effects.
+
+    The edges go from a source to an effect depending on it, and from the effect of a computed to the source of the
+    computed value.
+    '''
+    sources: Dict[str, SourceNode]
+    effects: Dict[str, EffectNode]
+    edges: List[Tuple[str, str]]
+
+    def __init__(self) -> None:
+        self.sources = {}
+        self.effects = {}
+        self.edges = []
+
+    def hot_sources(self, top_n: int = 10) -> List[SourceNode]:
+        '''Return the sources with the most subscribers, descending.'''
+        return sorted(self.sources.values(), key=lambda node: node.fan_out, reverse=True)[:top_n]
+
+    def stats(self) -> Dict[str, Any]:
+        '''Return the numbers of nodes and edges, and the max and mean fan-out of the sources and fan-in of the
+        effects.'''
+        fan_outs = [node.fan_out for node in self.sources.values()]
+        fan_ins = [node.fan_in for node in self.effects.values()]
+        return {
+            'sources': len(self.sources),
+            'effects': len(self.effects),
+            'edges': len(self.edges),
+            'max_fan_out': max(fan_outs, default=0),
+            'mean_fan_out': sum(fan_outs) / len(fan_outs) if fan_outs else 0.0,
+            'max_fan_in': max(fan_ins, default=0),
+            'mean_fan_in': sum(fan_ins) / len(fan_ins) if fan_ins else 0.0,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'sources': [{name: getattr(node, name) for name in SourceNode.__slots__} for node in self.sources.values()],
+            'effects': [{name: getattr(node, name) for name in EffectNode.__slots__} for node in self.effects.values()],
+            'edges': [list(edge) for edge in self.edges],
+            'stats': self.stats(),
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        '''Export the graph to JSON, the keyword arguments are passed to `json.dumps()`.'''
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_dot(self) -> str:
+        '''Export the graph to the DOT language of Graphviz.'''
+        lines = ['digraph reactivity {', '    rankdir=LR;']
+        for node in self.sources.values():
+            label = f'{node.type}[{node.key}]' if node.key else node.type
+            lines.append(f'    {node.id} [shape=ellipse, label={json.dumps(label)}];')
+        for node in self.effects.values():
+            lines.append(f'    {node.id} [shape=box, label={json.dumps(f"{node.kind} {node.name}")}];')
+        for tail, head in self.edges:
+            lines.append(f'    {tail} -> {head};')
+        lines.append('}')
+        return '\n'.join(lines)
+
+
+def __get_source_node(node_id: str, dep: Dep) -> SourceNode:
+    target: object = dep.target
+    t = type(target)
+    # The values are not read, as reading a computed may re-compute it.
+    flags = get_type_flags(t)
+    if FLAG_OF_COMPUTED_REF in flags:
+        kind = 'computed'
+    elif FLAG_OF_REF in flags:
+        kind = 'ref'
+    else:
+        kind = 'reactive'
+        t = reactive_reversed_class_map.get(t, t)
+    key = '' if kind != 'reactive' and dep.key == REF_VALUE else str(dep.key)
+    return SourceNode(node_id, kind, t.__name__, id(target), key, len(dep.subs))
+
+
+def get_dependency_graph() -> DependencyGraph:
+    '''
+    Take a snapshot of the live dependency graph: the reactive values with subscribers (the keys of reactive
+    objects, refs and computeds), the effects (including the ones of computeds and watchers) and the subscriptions.
+
+    Returns:
+        The snapshot, which can be exported to DOT or JSON.
+    '''
+    graph = DependencyGraph()
+    source_ids: Dict[int, str] = {}
+    effect_ids: Dict[int, str] = {}
+    effects = sorted(live_effects, key=lambda effect: effect.id)
+    for effect in effects:
+        if not effect.active:
+            continue
+        effect_ids[id(effect)] = node_id = f'e{effect.id}'
+        name = getattr(effect.fn, '__qualname__', repr(effect.fn))
+        graph.effects[node_id] = EffectNode(node_id, effect.kind, name, len(effect.deps))
+    for effect in effects:
+        effect_id = effect_ids.get(id(effect))
+        if effect_id is None:
+            continue
+        for dep in effect.deps:
+            source_id = source_ids.get(id(dep))
+            if source_id is None:
+                source_ids[id(dep)] = source_id = f's{len(source_ids)}'
+                graph.sources[source_id] = __get_source_node(source_id, dep)
+            graph.edges.append((source_id, effect_id))
+    # The effect of a computed produces the value of the computed.
+    for effect in effects:
+        effect_id = effect_ids.get(id(effect))
+        if effect_id is None or effect.computed is None:
+            continue
+        source_id = source_ids.get(id(effect.computed.deps[REF_VALUE]))
+        if source_id is not None:
+            graph.edges.append((effect_id, source_id))
+    return graph
+
+
+__all__ = ['DependencyGraph', 'SourceNode', 'EffectNode', 'get_dependency_graph']
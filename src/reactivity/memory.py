@@ -0,0 +1,101 @@
+import sys
+from typing import Any, Dict, Set
+
+from reactivity.effect.dep import Dep
+from reactivity.effect.vars import live_effects
+from reactivity.reactive.utils import (get_reactive_deps, get_reactive_registries, reactive_class_map,
+                                       readonly_class_map, shallow_reactive_class_map, shallow_readonly_class_map)
+
+
+def __get_dep_size(dep: Dep) -> int:
+    return sys.getsizeof(dep) + sys.getsizeof(dep.subs)
+
+
+def memory_report() -> Dict[str, Any]:
+    '''
+    Report the objects held by the reactivity layer itself, with their approximate sizes in bytes.
+
+    The sizes are shallow (`sys.getsizeof()`), so the original objects are not counted, as they belong to the
+    application. The deps of refs and computeds are only found through the effects subscribing to them.
+
+    Returns:
+        A JSON serializable dict with:
+
+        - `proxies`: the numbers of the live reactive, shallow reactive, readonly and shallow readonly objects.
+        - `proxy_classes`: the number of the proxy classes created.
+        - `marked_raw`: the number of the objects marked as raw which are recorded by id, i.e. the ones without
+          `__dict__`.
+        - `deps`: the number of the deps, `subscribed_deps` the number of the ones with subscribers, and
+          `subscriptions` the number of the links between the deps and the effects.
+        - `effects`: the number of the live effects (including the ones of computeds and watchers),
+          `active_effects` the number of the ones which are not stopped (whether they are running at the moment or
+          not), and `stopped_effects` the number of the stopped ones which are still referenced.
+        - `bytes`: the approximate sizes of the `registries`, `proxies`, `deps` and `effects`, and the `total`.
+    '''
+    registries = get_reactive_registries()
+    proxies: Dict[str, int] = {}
+    registry_bytes = 0
+    proxy_bytes = 0
+    dep_bytes = 0
+    # The deps are collected by id, as the deep and shallow reactive objects of an original object share them.
+    deps: Dict[int, Dep] = {}
+    deps_tables: Set[int] = set()
+    for name, registry in registries.items():
+        # The entries are copied first, as the weak reference callbacks may remove some of them (e.g. when a garbage
+        # collection happens) while they are iterated.
+        values = list(registry.values())
+        registry_bytes += sys.getsizeof(registry) + sum(sys.getsizeof(value) for value in values)
+        if name == 'marked_raw':
+            continue
+        count = 0
+        for observed_ref in values:
+            observed = observed_ref()
+            if observed is None:
+                continue
+            count += 1
+            proxy_bytes += sys.getsizeof(observed)
+            table = get_reactive_deps(observed)
+            if id(table) in deps_tables:
+                continue
+            deps_tables.add(id(table))
+            dep_bytes += sys.getsizeof(table)
+            for dep in table.values():
+                deps[id(dep)] = dep
+        proxies[name] = count
+
+    effects = list(live_effects)
+    effect_bytes = 0
+    subscriptions = 0
+    active_effects = 0
+    for effect in effects:
+        effect_bytes += sys.getsizeof(effect) + sys.getsizeof(vars(effect)) + sys.getsizeof(effect.deps)
+        if effect.active:
+            active_effects += 1
+        for dep, link in effect.deps.items():
+            deps[id(dep)] = dep
+            subscriptions += 1
+            effect_bytes += sys.getsizeof(link)
+    dep_bytes += sum(__get_dep_size(dep) for dep in deps.values())
+
+    return {
+        'proxies': proxies,
+        'proxy_classes': sum(len(class_map) for class_map in (reactive_class_map, shallow_reactive_class_map,
+                                                              readonly_class_map, shallow_readonly_class_map)),
+        'marked_raw': len(registries['marked_raw']),
+        'deps': len(deps),
+        'subscribed_deps': sum(1 for dep in deps.values() if dep.subs),
+        'subscriptions': subscriptions,
+        'effects': len(effects),
+        'active_effects': active_effects,
+        'stopped_effects': len(effects) - active_effects,
+        'bytes': {
+            'registries': registry_bytes,
+            'proxies': proxy_bytes,
+            'deps': dep_bytes,
+            'effects': effect_bytes,
+            'total': registry_bytes + proxy_bytes + dep_bytes + effect_bytes,
+        },
+    }
+
+
+__all__ = ['memory_report']
@@ -0,0 +1,119 @@
+import random
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Tuple
+
+from reactivity.effect import ReactiveEffect
+from reactivity.effect.definations import ReactiveEffectDef
+
+
+class EffectStats:
+    '''The profiling counters of an effect, counting the sampled runs only.'''
+    __slots__ = ('id', 'name', 'runs', 'total_time', 'max_time', 'deps', 'triggers')
+
+    id: int
+    # The qualified name of the function run by the effect.
+    name: str
+    runs: int
+    # The wall time of the runs in seconds, including the effects run inside them.
+    total_time: float
+    max_time: float
+    # The number of deps tracked by the latest run.
+    deps: int
+    # (the type name of the target, the key) -> the number of runs triggered by changing it. The values read by a
+    # run which have changed since the previous run are counted, so the effects skipped (e.g. as the computeds they
+    # depend on are unchanged) count nothing.
+    triggers: Dict[Tuple[str, Any], int]
+
+    def __init__(self, effect: ReactiveEffectDef[Any]) -> None:
+        self.id = effect.id
+        self.name = getattr(effect.fn, '__qualname__', repr(effect.fn))
+        self.runs = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.deps = 0
+        self.triggers = {}
+
+    def __repr__(self) -> str:
+        return (f'<EffectStats id={self.id} name={self.name} runs={self.runs} total_time={self.total_time:.6f} '
+                f'max_time={self.max_time:.6f} deps={self.deps}>')
+
+
+# The stats are released along with the effects, so that profiling does not keep anything alive.
+__effect_stats: 'weakref.WeakKeyDictionary[ReactiveEffectDef[Any], EffectStats]' = weakref.WeakKeyDictionary()
+# The method of the class itself, restored when profiling is disabled.
+__original_run: Callable[[ReactiveEffect[Any]], Any] = vars(ReactiveEffect)['run']
+
+
+def __get_stats(effect: ReactiveEffectDef[Any]) -> EffectStats:
+    stats = __effect_stats.get(effect)
+    if stats is None:
+        stats = __effect_stats[effect] = EffectStats(effect)
+    return stats
+
+
+def enable_profiling(sample_rate: float = 1.0) -> None:
+    '''
+    Start recording the runs of the effects (including the ones of computeds and watchers), see `stats()`.
+
+    The counters recorded before are cleared. While profiling is disabled, the effects run without any
+    instrumentation at all.
+
+    Args:
+        sample_rate: The ratio of the runs to record, which bounds the overhead of profiling. Defaults to 1.0,
+            which records every run.
+    '''
+    if not 0.0 < sample_rate <= 1.0:
+        raise ValueError(f'The sample rate must be in (0, 1], got {sample_rate!r}.')
+    disable_profiling()
+    __effect_stats.clear()
+    original_run = __original_run
+    get_stats = __get_stats
+    perf_counter = time.perf_counter
+    sample = random.random
+
+    def run(self: ReactiveEffect[Any]) -> Any:
+        if sample_rate < 1.0 and sample() >= sample_rate:
+            return original_run(self)
+        stats = get_stats(self)
+        for dep, link in self.deps.items():
+            if dep.version != link.version:
+                trigger = (type(dep.target).__name__, dep.key)
+                stats.triggers[trigger] = stats.triggers.get(trigger, 0) + 1
+        start = perf_counter()
+        try:
+            return original_run(self)
+        finally:
+            elapsed = perf_counter() - start
+            stats.runs += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+            stats.deps = len(self.deps)
+
+    # The method is replaced only while profiling, so that the effects pay nothing for it otherwise.
+    setattr(ReactiveEffect, 'run', run)
+
+
+def disable_profiling() -> None:
+    '''Stop recording the runs of the effects. The counters recorded are kept until profiling is enabled again.'''
+    setattr(ReactiveEffect, 'run', __original_run)
+
+
+def stats(top_n: int = 10) -> List[EffectStats]:
+    '''
+    Return the counters of the most expensive effects, recorded since profiling is enabled.
+
+    Args:
+        top_n: The number of effects to return. Defaults to 10.
+
+    Returns:
+        The counters of the effects, sorted by the total wall time of their runs, descending.
+    '''
+    result = sorted((stats for stats in __effect_stats.values() if stats.runs),
+                    key=lambda stats: stats.total_time,
+                    reverse=True)
+    return result[:top_n]
+
+
+__all__ = ['EffectStats', 'enable_profiling', 'disable_profiling', 'stats']
@@ -1,18 +1,26 @@
 # pyright: reportMissingTypeStubs=false
 
 import types
-from typing import (Any, Dict, ItemsView, Mapping, MutableMapping, MutableSequence, Optional, Sequence, Set, Tuple,
-                    TypeVar, Union, ValuesView, cast, overload)
-
-from reactivity.env import DEBUG
-from reactivity.flags import FLAG_OF_REACTIVE, FLAG_OF_SKIP
+import weakref
+from typing import (Any, Callable, Dict, FrozenSet, Generic, ItemsView, Iterator, List, Mapping, MutableMapping,
+                    MutableSequence, Optional, Sequence, Set, Tuple, TypeVar, Union, ValuesView, cast, overload)
+
+from reactivity.equality import Equals, get_equals_function
+from reactivity.flags import (CHILDREN_OF_REACTIVE, DEPS_OF_REACTIVE, EQUALS_OF_REACTIVE, FLAG_OF_REACTIVE,
+                              FLAG_OF_READONLY, FLAG_OF_REF, FLAG_OF_SKIP, ITERATE_KEY, LENGTH_KEY, RAW_OF_REACTIVE,
+                              REACTIVITY_VALUE)
 from reactivity.ref.definitions import Ref
 from reactivity.ref.utils import is_ref
+from reactivity.utils import get_type_flags, is_readonly
 
-from .utils import (deep_to_raw, get_global_reactive_obj, is_in_global_reactive_object_map, is_marked_raw, is_reactive,
-                    mark_raw, reactive_class_map, reactive_reversed_class_map, record_new_reactive_obj, to_raw,
-                    track_reactive, track_reactive_value, trigger_reactive, trigger_reactive_value)
-from .vars import immutable_builtin_types
+from .utils import (deep_to_raw, get_equals_getter, get_explicit_equals, get_global_reactive_obj, get_raw_getter,
+                    get_reactive_children, is_marked_raw, is_reactive, mark_raw, reactive_class_map,
+                    reactive_reversed_class_map, readonly_class_map, record_new_reactive_obj, set_explicit_equals,
+                    shallow_reactive_class_map, shallow_readonly_class_map, to_raw, track_reactive, track_reactive_key,
+                    track_reactive_value, trigger_reactive, trigger_reactive_added_key, trigger_reactive_all,
+                    trigger_reactive_keys)
+from .vars import (ATTRIBUTE_KIND_BOUND, ATTRIBUTE_KIND_DATA, ATTRIBUTE_KIND_MAGIC, TYPE_KIND_CHECK, TYPE_KIND_PROXY,
+                   TYPE_KIND_SKIP, immutable_builtin_types, immutable_scalar_types)
 
 T = TypeVar('T')
 U = TypeVar('U')
@@ -32,37 +40,130 @@ def _unref_and_reactive(obj: Union[Ref[T], T]) -> T:
     return cast(Ref[T], obj).value if is_ref(obj) else reactive(cast(T, obj))
 
 
+def _unref_and_readonly(obj: Any) -> Any:
+    return readonly(obj.value) if is_ref(obj) else readonly(obj)
+
+
+def _to_readonly_item(item: Any) -> Any:
+    '''Return the readonly version of an item of a list. Like the reactive lists, the refs are not unwrapped, they
+    are wrapped in readonly refs instead.
+    '''
+    return ReadonlyRefImpl(item) if is_ref(item) else readonly(item)
+
+
+class ReadonlyRefImpl(Generic[T]):
+    '''A readonly view of a ref read out of a readonly list, whose value is readonly as well.'''
+    __target: Ref[T]
+
+    def __init__(self, target: Ref[T]) -> None:
+        self.__target = target
+
+    @property
+    def value(self) -> T:
+        return readonly(self.__target.value)
+
+    @value.setter
+    def value(self, value: T) -> None:
+        raise AttributeError('Cannot set the value of a readonly ref.')
+
+    def __str__(self) -> str:
+        return f'<ReadonlyRef of {self.__target}>'
+
+
+# The flags are set on the class, so that `is_ref()` and `is_readonly()` are true for its instances.
+setattr(ReadonlyRefImpl, FLAG_OF_REF, True)
+setattr(ReadonlyRefImpl, FLAG_OF_READONLY, True)
+
+
+def _get_reactive_child(observed: object, key: Any, value: Any) -> Any:
+    '''Return the reactive object of a value read out of a reactive object under a key.
+
+    The reactive object is kept by the parent until the key is triggered, so that reading the same nested value again
+    is a lookup instead of creating its reactive object again. Nothing is kept after the parent is released.
+    '''
+    if type(value) in immutable_scalar_types:
+        return value
+    children = get_reactive_children(observed)
+    if children is not None:
+        child = children.get(key)
+        if child is not None and child[0] is value:
+            return child[1]
+    child_observed = reactive(value)
+    if child_observed is not value:
+        if children is None:
+            children = {}
+            object.__setattr__(observed, CHILDREN_OF_REACTIVE, children)
+        children[key] = (value, child_observed)
+    return child_observed
+
+
+def _get_item_key(key: Any, is_list: bool, is_dict: bool) -> Any:
+    '''Return the key to track for an item of a reactive object, which is a list if `is_list`, a dict if `is_dict`.
+
+    Only the items of dicts and the items of lists at non-negative indexes are tracked on their own, the others
+    (e.g. slices, or the items of other containers) are tracked as the whole value.
+    '''
+    if is_dict:
+        return key
+    if is_list and isinstance(key, int) and key >= 0:
+        return key
+    return REACTIVITY_VALUE
+
+
+def _get_set_element_key(element: Any) -> Any:
+    # Like `set.__contains__()`, a set is looked up as a frozenset.
+    return frozenset(cast(Set[Any], element)) if isinstance(element, set) else element
+
+
 class dict_items(ItemsView[T, U]):
     _mapping: Mapping[T, U]
 
+    def _wrap(self, value: Any) -> Any:
+        return _unref_and_reactive(value)
+
     def __contains__(self, item: object) -> bool:
         item = cast(Tuple[T, U], item)
         key, value = item
         try:
-            v = _unref_and_reactive(self._mapping[key])
+            v = self._wrap(self._mapping[key])
         except KeyError:
             return False
         else:
             return v is value or v == value
 
-    def __iter__(self):
+    def __iter__(self) -> Iterator[Tuple[T, U]]:
         for key in self._mapping:
-            yield (key, _unref_and_reactive(self._mapping[key]))
+            yield (key, self._wrap(self._mapping[key]))
 
 
 class dict_values(ValuesView[U]):
     _mapping: Mapping[Any, U]
 
+    def _wrap(self, value: Any) -> Any:
+        return _unref_and_reactive(value)
+
     def __contains__(self, value: object) -> bool:
         for key in self._mapping:
-            v = _unref_and_reactive(self._mapping[key])
+            v = self._wrap(self._mapping[key])
             if v is value or v == value:
                 return True
         return False
 
-    def __iter__(self):
+    def __iter__(self) -> Iterator[U]:
         for key in self._mapping:
-            yield _unref_and_reactive(self._mapping[key])
+            yield self._wrap(self._mapping[key])
+
+
+class readonly_dict_items(dict_items[T, U]):
+
+    def _wrap(self, value: Any) -> Any:
+        return _unref_and_readonly(value)
+
+
+class readonly_dict_values(dict_values[U]):
+
+    def _wrap(self, value: Any) -> Any:
+        return _unref_and_readonly(value)
 
 
 class ProxyMetaClass(type):
@@ -234,104 +335,177 @@ class ProxyMetaClass(type):
     }
     dict_track_methods: Set[str] = {'copy', 'fromkeys', 'get', 'items', 'keys', 'reversed', 'values'}
     dict_trigger_methods: Set[str] = {'clear', 'pop', 'popitem', 'setdefault', 'update'}
-
-    def __new__(cls, name: str, bases: Tuple[type, ...], attrs: Dict[str, Any]) -> Optional[type]:
+    # The bases whose methods are patched in addition to the general methods, in the order of the kinds below.
+    method_kind_bases: Tuple[type, ...] = (list, bytearray, Sequence, memoryview, set, dict)
+    # The kinds of a class (whether it is a subclass of each base above) -> the names of its track and trigger methods.
+    method_names_cache: Dict[Tuple[bool, ...], Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+
+    def __new__(cls,
+                name: str,
+                bases: Tuple[type, ...],
+                attrs: Dict[str, Any],
+                shallow: bool = False) -> Optional[type]:
         # Check if None is in bases, if so, it means that this is the first call to __new__ and we should not do anything
         if type(None) in bases:
             return None
 
-        # Clear the __init__ method of the proxy class
-        def __init__(self: object, *args: Any, **kwargs: Any):
-            pass
-
-        attrs['__init__'] = __init__
-        proxy_cls = type.__new__(cls, name, bases, attrs)
+        proxy_cls = cls.new_proxy_class(name, bases, attrs)
+        get_raw = get_raw_getter(proxy_cls)
+        track_methods, trigger_methods = cls.get_method_names(proxy_cls)
 
         patched_track_methods: Set[str] = set()
         patched_trigger_methods: Set[str] = set()
 
-        # patch list methods
-        if issubclass(proxy_cls, list):
-            for list_track_method in cls.list_track_methods:
-                cls.wrap_track_method(proxy_cls, list_track_method, patched_track_methods)
-            for list_trigger_method in cls.list_trigger_methods:
-                cls.wrap_trigger_method(proxy_cls, list_trigger_method, patched_trigger_methods)
-        # patch bytearray methods
-        if issubclass(proxy_cls, bytearray):
-            for bytearray_track_method in cls.bytearray_track_methods:
-                cls.wrap_track_method(proxy_cls, bytearray_track_method, patched_track_methods)
-            for bytearray_trigger_method in cls.bytearray_trigger_methods:
-                cls.wrap_trigger_method(proxy_cls, bytearray_trigger_method, patched_trigger_methods)
-        # patch sequence methods
-        if issubclass(proxy_cls, Sequence):
-            for sequence_track_method in cls.sequence_track_methods:
-                cls.wrap_track_method(proxy_cls, sequence_track_method, patched_track_methods)
-            for sequence_trigger_method in cls.sequence_trigger_methods:
-                cls.wrap_trigger_method(proxy_cls, sequence_trigger_method, patched_trigger_methods)
-        # patch memoryview methods
-        if issubclass(proxy_cls, memoryview):
-            for memoryview_track_method in cls.memoryview_track_methods:
-                cls.wrap_track_method(proxy_cls, memoryview_track_method, patched_track_methods)
-            for memoryview_trigger_method in cls.memoryview_trigger_methods:
-                cls.wrap_trigger_method(proxy_cls, memoryview_trigger_method, patched_trigger_methods)
-        # patch set methods
-        if issubclass(proxy_cls, set):
-            for set_track_method in cls.set_track_methods:
-                cls.wrap_track_method(proxy_cls, set_track_method, patched_track_methods)
-            for set_trigger_method in cls.set_trigger_methods:
-                cls.wrap_trigger_method(proxy_cls, set_trigger_method, patched_trigger_methods)
-        # patch dict methods
-        if issubclass(proxy_cls, dict):
-            cls.wrap_dict_view_method(proxy_cls, patched_track_methods)
-            cls.wrap_dict_get_method(proxy_cls, patched_track_methods)
-            for dict_track_method in cls.dict_track_methods:
-                cls.wrap_track_method(proxy_cls, dict_track_method, patched_track_methods)
-            for dict_trigger_method in cls.dict_trigger_methods:
-                cls.wrap_trigger_method(proxy_cls, dict_trigger_method, patched_trigger_methods)
-        # patch general methods
-        for general_track_method in cls.general_track_methods:
-            cls.wrap_track_method(proxy_cls, general_track_method, patched_track_methods)
-        for general_trigger_method in cls.general_trigger_methods:
-            cls.wrap_trigger_method(proxy_cls, general_trigger_method, patched_trigger_methods)
-
-        cls.wrap_item_methods(proxy_cls, patched_track_methods, patched_trigger_methods)
-        cls.wrap_attr_methods(proxy_cls, patched_track_methods, patched_trigger_methods)
+        # patch the methods depending on or changing some keys only
+        is_list, is_dict, is_set = cls.get_container_kinds(proxy_cls)
+        if is_list:
+            cls.wrap_list_key_methods(proxy_cls, patched_track_methods, patched_trigger_methods)
+        if is_set:
+            cls.wrap_set_key_methods(proxy_cls, patched_track_methods, patched_trigger_methods)
+        if is_dict:
+            cls.wrap_dict_view_method(proxy_cls, patched_track_methods, shallow)
+            cls.wrap_dict_get_method(proxy_cls, patched_track_methods, shallow)
+            cls.wrap_dict_key_methods(proxy_cls, patched_track_methods, patched_trigger_methods)
+        # patch the other methods, depending on or changing the whole value
+        for method_name in track_methods - patched_track_methods:
+            cls.wrap_track_method(proxy_cls, method_name, get_raw)
+        for method_name in trigger_methods - patched_trigger_methods:
+            cls.wrap_trigger_method(proxy_cls, method_name, get_raw)
+        patched_track_methods |= track_methods
+        patched_trigger_methods |= trigger_methods
+
+        cls.wrap_item_methods(proxy_cls, patched_track_methods, patched_trigger_methods, shallow)
+        cls.wrap_attr_methods(proxy_cls, patched_track_methods, patched_trigger_methods, shallow)
 
         # Set the sign of reactive object
         setattr(proxy_cls, FLAG_OF_REACTIVE, True)
 
         return proxy_cls
 
+    @classmethod
+    def new_proxy_class(cls, name: str, bases: Tuple[type, ...], attrs: Dict[str, Any]) -> type:
+
+        # Clear the __init__ method of the proxy class
+        def __init__(self: object, *args: Any, **kwargs: Any):
+            pass
+
+        attrs['__init__'] = __init__
+        # The original object, the deps, the equality function and the reactive objects of the nested values are
+        # stored in slots, so that getting them is a single attribute load.
+        slots = [RAW_OF_REACTIVE, DEPS_OF_REACTIVE, EQUALS_OF_REACTIVE, CHILDREN_OF_REACTIVE]
+        if not any(base.__weakrefoffset__ for base in bases):
+            slots.append('__weakref__')
+        attrs['__slots__'] = tuple(slots)
+        try:
+            return type.__new__(cls, name, bases, attrs)
+        except TypeError:
+            # e.g. the subclasses of tuple cannot have slots, the attributes are stored in `__dict__` instead.
+            del attrs['__slots__']
+            return type.__new__(cls, name, bases, attrs)
+
+    @staticmethod
+    def get_container_kinds(proxy_cls: type) -> Tuple[bool, bool, bool]:
+        '''Return whether a proxy class is a list, a dict and a set.
+
+        The checks are kept out of the callers, as `issubclass()` would narrow the class to a partially unknown type
+        (e.g. `type[list[Unknown]]`) there.
+        '''
+        return issubclass(proxy_cls, list), issubclass(proxy_cls, dict), issubclass(proxy_cls, set)
+
+    @classmethod
+    def get_method_names(cls, proxy_cls: type) -> Tuple[Set[str], Set[str]]:
+        '''Return the names of the track methods and the trigger methods of a proxy class.'''
+        # The names available on the class, collected at once instead of calling `hasattr()` for each method name.
+        available_names: Set[str] = set()
+        for base in proxy_cls.__mro__:
+            available_names.update(base.__dict__)
+        kinds = tuple(
+            # Checking an ABC is slow for a new class, and a sequence must have `__getitem__()` anyway.
+            ('__getitem__' in available_names and issubclass(proxy_cls, base)) if base is Sequence else issubclass(
+                proxy_cls, base) for base in cls.method_kind_bases)
+        method_names = cls.method_names_cache.get(kinds)
+        if method_names is None:
+            track_methods: Set[str] = set(cls.general_track_methods)
+            trigger_methods: Set[str] = set(cls.general_trigger_methods)
+            for is_kind, base_track_methods, base_trigger_methods in zip(kinds, (
+                    cls.list_track_methods,
+                    cls.bytearray_track_methods,
+                    cls.sequence_track_methods,
+                    cls.memoryview_track_methods,
+                    cls.set_track_methods,
+                    cls.dict_track_methods,
+            ), (
+                    cls.list_trigger_methods,
+                    cls.bytearray_trigger_methods,
+                    cls.sequence_trigger_methods,
+                    cls.memoryview_trigger_methods,
+                    cls.set_trigger_methods,
+                    cls.dict_trigger_methods,
+            )):
+                if is_kind:
+                    track_methods |= base_track_methods
+                    trigger_methods |= base_trigger_methods
+            # Like `list.__iadd__()`, some trigger methods are also track methods of other types.
+            method_names = cls.method_names_cache[kinds] = (frozenset(track_methods - trigger_methods),
+                                                            frozenset(trigger_methods))
+        track_names, trigger_names = method_names
+        return available_names & track_names, available_names & trigger_names
+
     @staticmethod
-    def wrap_attr_methods(proxy_cls: type, patched_track_methods: Set[str], patched_trigger_methods: Set[str]):
+    def wrap_attr_methods(proxy_cls: type,
+                          patched_track_methods: Set[str],
+                          patched_trigger_methods: Set[str],
+                          shallow: bool = False):
         # sourcery skip: assign-if-exp, reintroduce-else
+        get_raw = get_raw_getter(proxy_cls)
+        get_equals = get_equals_getter(proxy_cls)
 
         has_setattr = hasattr(proxy_cls, '__setattr__')
 
         if hasattr(proxy_cls, '__getattribute__'):
             raw__getattribute__ = getattr(proxy_cls, '__getattribute__')
 
+            raw_class = proxy_cls.__mro__[1]
+            # name -> the kind of the attribute. The class attributes are not expected to be replaced after the
+            # class is made reactive, so that the kinds can be cached.
+            attribute_kinds: Dict[str, int] = {}
+
+            def classify_attribute(name: str) -> int:
+                if name in patched_track_methods or name in patched_trigger_methods or (name.startswith('__')
+                                                                                       and name.endswith('__')):
+                    return ATTRIBUTE_KIND_MAGIC
+                for base in raw_class.__mro__:
+                    if name in base.__dict__:
+                        attr = base.__dict__[name]
+                        if isinstance(attr, (property, classmethod, staticmethod)) or (callable(attr)
+                                                                                       and hasattr(attr, '__get__')):
+                            return ATTRIBUTE_KIND_BOUND
+                        break
+                return ATTRIBUTE_KIND_DATA
+
             def __getattribute__(self: object, name: str):
+                kind = attribute_kinds.get(name)
+                if kind is None:
+                    kind = attribute_kinds[name] = classify_attribute(name)
                 # If the attribute is patched, return the original attribute and do not track it
-                is_magic: bool = name.startswith('__') and name.endswith('__')
-                if name in patched_track_methods or name in patched_trigger_methods or is_magic:
+                if kind == ATTRIBUTE_KIND_MAGIC:
                     return raw__getattribute__(self, name)
 
-                original = to_raw(self)
                 track_reactive(self, name)
-                if DEBUG:
-                    print(f'''[Reactive] track({name}): self={repr(self)} at {hex(id(self))} ({id(self)})''')
 
-                result = original.__getattribute__(name)
-                if name in original.__class__.__dict__ and getattr(original.__class__, name) and isinstance(
-                        getattr(original.__class__, name), property):
-                    result = raw__getattribute__(self, name)
-                if callable(result):
+                if kind == ATTRIBUTE_KIND_BOUND:
                     result = raw__getattribute__(self, name)
+                else:
+                    result = get_raw(self).__getattribute__(name)
+                if type(result) in immutable_scalar_types:
+                    return result
 
+                # The values of a shallow reactive object are returned as is.
+                if shallow:
+                    return result
                 if is_ref(result):
                     return result.value
-                return reactive(result)
+                return _get_reactive_child(self, name, result)
 
             setattr(proxy_cls, '__getattribute__', __getattribute__)
             patched_track_methods.add('__getattribute__')
@@ -341,28 +515,25 @@ class ProxyMetaClass(type):
             def __setattr__(self: object, name: str, value: Any):
                 if is_reactive(value):
                     value = to_raw(value)
-                original = to_raw(self)
+                original = get_raw(self)
+                equals = get_equals(self)
                 old_value = original.__getattribute__(name) if hasattr(self, name) else None
-                if is_ref(old_value):
+                if not shallow and is_ref(old_value):
                     old_value = cast(Ref[Any], old_value)
                     if is_ref(value):
                         value = cast(Ref[Any], value)
-                        if old_value.value == value.value:
+                        if equals(value.value, old_value.value):
                             return
                         original.__setattr__(name, value)
                     else:
-                        if old_value.value == value:
+                        if equals(value, old_value.value):
                             return
                         old_value.value = value
                 else:
-                    if old_value == value:
+                    if equals(value, old_value):
                         return
                     original.__setattr__(name, value)
                 trigger_reactive(self, name)
-                if DEBUG:
-                    print(
-                        f'''[Reactive] __setattr__: name={name}, value={value}, self={repr(self)} at {hex(id(self))} ({id(self)})'''
-                    )
 
             setattr(proxy_cls, '__setattr__', __setattr__)
             patched_trigger_methods.add('__setattr__')
@@ -370,11 +541,9 @@ class ProxyMetaClass(type):
         if hasattr(proxy_cls, '__delattr__'):
 
             def __delattr__(self: object, name: str):
-                original = to_raw(self)
+                original = get_raw(self)
                 original.__delattr__(name)
                 trigger_reactive(self, name)
-                if DEBUG:
-                    print(f'''[Reactive] __delattr__: name={name}, self={repr(self)} at {hex(id(self))} ({id(self)})''')
 
             setattr(proxy_cls, '__delattr__', __delattr__)
             patched_trigger_methods.add('__delattr__')
@@ -383,210 +552,645 @@ class ProxyMetaClass(type):
 
             def __dir__(self: object):
                 track_reactive(self, '__dir__')
-                if DEBUG:
-                    print(f'''[Reactive] __dir__: self={repr(self)} at {hex(id(self))} ({id(self)})''')
-                original = to_raw(self)
+                original = get_raw(self)
                 return original.__dir__()
 
             setattr(proxy_cls, '__dir__', __dir__)
             patched_track_methods.add('__dir__')
 
     @staticmethod
-    def wrap_item_methods(proxy_cls: type, patched_methods: Set[str], patched_trigger_methods: Set[str]):
+    def wrap_item_methods(proxy_cls: type,
+                          patched_methods: Set[str],
+                          patched_trigger_methods: Set[str],
+                          shallow: bool = False):
         # sourcery skip: assign-if-exp, reintroduce-else
+        get_raw = get_raw_getter(proxy_cls)
+        get_equals = get_equals_getter(proxy_cls)
         has_getitem = hasattr(proxy_cls, '__getitem__')
         has_setitem = hasattr(proxy_cls, '__setitem__')
+        # The original objects are instances of the original class, so their types are checked once here.
+        is_list = issubclass(proxy_cls, list)
+        is_dict = issubclass(proxy_cls, dict)
 
         if has_getitem:
 
             def __getitem__(self: Union[Sequence[Any], Mapping[Any, Any]], key: slice):
-                original = to_raw(self)
-                track_reactive_value(self)
-                if DEBUG:
-                    print(
-                        f'''[Reactive] track(__getitem__): key={key}, self={repr(self)} at {hex(id(self))} ({id(self)})'''
-                    )
+                original = get_raw(self)
+                item_key = _get_item_key(key, is_list, is_dict)
+                track_reactive_key(self, item_key)
                 result = original.__getitem__(key)
-                if is_ref(result) and not isinstance(self, list):
+                if shallow:
+                    return result
+                if is_ref(result) and not is_list:
                     return cast(Ref[Any], result).value
-                return reactive(result)
+                return _get_reactive_child(self, item_key, result)
 
             setattr(proxy_cls, '__getitem__', __getitem__)
             patched_methods.add('__getitem__')
 
         if has_setitem:
 
-            def __setitem__(self: Union[MutableSequence[Any], MutableMapping[Any, Any]], key: slice, value: Any):
+            def __setitem__(self: Union[MutableSequence[Any], MutableMapping[Any, Any]], key: Any, value: Any):
                 if is_reactive(value):
                     value = to_raw(value)
-                original = to_raw(self)
-                old_value = original.__getitem__(key) if key in self else None
-                if is_ref(old_value):
+                original = get_raw(self)
+                if is_list:
+                    try:
+                        old_value = original.__getitem__(key)
+                        has_key = True
+                    except (IndexError, TypeError):
+                        old_value = None
+                        has_key = False
+                else:
+                    has_key = key in original
+                    old_value = original.__getitem__(key) if has_key else None
+                equals = get_equals(self)
+                if not shallow and is_ref(old_value):
                     old_value = cast(Ref[Any], old_value)
                     if is_ref(value):
                         value = cast(Ref[Any], value)
-                        if old_value.value == value.value:
+                        if equals(value.value, old_value.value):
                             return
                         original.__setitem__(key, value)
                     else:
-                        if old_value.value == value:
+                        if equals(value, old_value.value):
                             return
                         old_value.value = value
                 else:
-                    if old_value == value:
+                    if has_key and equals(value, old_value):
                         return
                     original.__setitem__(key, value)
-                trigger_reactive_value(self)
-                if DEBUG:
-                    print(
-                        f'''[Reactive] trigger(__setitem__): key={key}, value={value}, self={repr(self)} at {hex(id(self))} ({id(self)})'''
-                    )
+                if is_dict:
+                    if has_key:
+                        trigger_reactive_keys(self, (key, REACTIVITY_VALUE))
+                    else:
+                        trigger_reactive_added_key(self, key)
+                elif is_list and isinstance(key, int):
+                    index = key + len(original) if key < 0 else key
+                    trigger_reactive_keys(self, (index, REACTIVITY_VALUE))
+                else:
+                    trigger_reactive_all(self)
 
             setattr(proxy_cls, '__setitem__', __setitem__)
             patched_trigger_methods.add('__setitem__')
 
     @staticmethod
-    def wrap_track_method(proxy_cls: type, method_name: str, patched_methods: Set[str]) -> None:
-        if not hasattr(proxy_cls, method_name) or method_name in patched_methods:
-            return
+    def wrap_track_method(proxy_cls: type, method_name: str, get_raw: Callable[[Any], Any]) -> None:
 
         def wrapper(self: object, *args: Any, **kwargs: Any):
-            original = to_raw(self)
+            original = get_raw(self)
             track_reactive_value(self)
-            if DEBUG:
-                print(
-                    f'''[Reactive] track({method_name}): args={args}, kwargs={kwargs}, self={repr(self)} at {hex(id(self))} ({id(self)})'''
-                )
             result = original.__getattribute__(method_name)(*args, **kwargs)
             return result
 
         setattr(proxy_cls, method_name, wrapper)
-        patched_methods.add(method_name)
 
     @staticmethod
-    def wrap_trigger_method(proxy_cls: type, method_name: str, patched_methods: Set[str]) -> None:
-        if not hasattr(proxy_cls, method_name) or method_name in patched_methods:
-            return
+    def wrap_trigger_method(proxy_cls: type, method_name: str, get_raw: Callable[[Any], Any]) -> None:
 
         def wrapper(self: object, *args: Any, **kwargs: Any):
-            original = to_raw(self)
+            original = get_raw(self)
             result = original.__getattribute__(method_name)(*args, **kwargs)
-            trigger_reactive_value(self)
-            if DEBUG:
-                print(
-                    f'''[Reactive] trigger({method_name}): args={args}, kwargs={kwargs}, self={repr(self)} at {hex(id(self))} ({id(self)})'''
-                )
+            # The affected keys are unknown, e.g. `list.insert()` shifts all the items after the index.
+            trigger_reactive_all(self)
             return result
 
         setattr(proxy_cls, method_name, wrapper)
+
+    @staticmethod
+    def wrap_key_track_method(proxy_cls: type, method_name: str, key: str, patched_methods: Set[str]) -> None:
+        '''Wrap a method which only depends on a special key, e.g. `ITERATE_KEY` or `LENGTH_KEY`.'''
+        if not hasattr(proxy_cls, method_name) or method_name in patched_methods:
+            return
+        get_raw = get_raw_getter(proxy_cls)
+
+        def wrapper(self: object, *args: Any, **kwargs: Any):
+            original = get_raw(self)
+            track_reactive(self, key)
+            return original.__getattribute__(method_name)(*args, **kwargs)
+
+        setattr(proxy_cls, method_name, wrapper)
         patched_methods.add(method_name)
 
     @staticmethod
-    def wrap_dict_get_method(proxy_cls: type, patched_track_methods: Set[str]):
+    def wrap_contains_method(proxy_cls: type, patched_track_methods: Set[str]) -> None:
+        if not hasattr(proxy_cls, '__contains__') or '__contains__' in patched_track_methods:
+            return
+        get_raw = get_raw_getter(proxy_cls)
+        is_set = issubclass(proxy_cls, set)
+
+        def __contains__(self: Union[Set[Any], Dict[Any, Any]], key: Any) -> bool:
+            original = get_raw(self)
+            track_reactive_key(self, _get_set_element_key(key) if is_set else key)
+            return original.__contains__(key)
+
+        setattr(proxy_cls, '__contains__', __contains__)
+        patched_track_methods.add('__contains__')
+
+    @staticmethod
+    def wrap_dict_key_methods(proxy_cls: type, patched_track_methods: Set[str], patched_trigger_methods: Set[str]):
+        get_raw = get_raw_getter(proxy_cls)
+        for method_name in ('__iter__', '__reversed__', 'keys'):
+            ProxyMetaClass.wrap_key_track_method(proxy_cls, method_name, ITERATE_KEY, patched_track_methods)
+        ProxyMetaClass.wrap_key_track_method(proxy_cls, '__len__', LENGTH_KEY, patched_track_methods)
+        ProxyMetaClass.wrap_contains_method(proxy_cls, patched_track_methods)
+
+        def __delitem__(self: Dict[Any, Any], key: Any) -> None:
+            original = get_raw(self)
+            original.__delitem__(key)
+            trigger_reactive_added_key(self, key)
+
+        def pop(self: Dict[Any, Any], key: Any, *args: Any) -> Any:
+            original = get_raw(self)
+            has_key = key in original
+            result = original.pop(key, *args)
+            if has_key:
+                trigger_reactive_added_key(self, key)
+            return result
+
+        def popitem(self: Dict[Any, Any]) -> Tuple[Any, Any]:
+            original = get_raw(self)
+            key, value = original.popitem()
+            trigger_reactive_added_key(self, key)
+            return key, value
+
+        def setdefault(self: Dict[Any, Any], key: Any, default: Any = None) -> Any:
+            original = get_raw(self)
+            has_key = key in original
+            result = original.setdefault(key, default)
+            if not has_key:
+                trigger_reactive_added_key(self, key)
+            return result
+
+        def update(self: Dict[Any, Any], *args: Any, **kwargs: Any) -> None:
+            original = get_raw(self)
+            items: Dict[Any, Any] = dict(*(to_raw(arg) for arg in args), **kwargs)
+            has_new_key = any(key not in original for key in items)
+            original.update(items)
+            keys = [*items, REACTIVITY_VALUE]
+            if has_new_key:
+                keys += [ITERATE_KEY, LENGTH_KEY]
+            trigger_reactive_keys(self, keys)
+
+        def __ior__(self: Dict[Any, Any], other: Any) -> Dict[Any, Any]:
+            update(self, other)
+            return self
+
+        for method in (__delitem__, pop, popitem, setdefault, update, __ior__):
+            if hasattr(proxy_cls, method.__name__) and method.__name__ not in patched_trigger_methods:
+                setattr(proxy_cls, method.__name__, method)
+                patched_trigger_methods.add(method.__name__)
+
+    @staticmethod
+    def wrap_list_key_methods(proxy_cls: type, patched_track_methods: Set[str], patched_trigger_methods: Set[str]):
+        get_raw = get_raw_getter(proxy_cls)
+        # Iterating a list depends on every item, so only the length is tracked on its own.
+        ProxyMetaClass.wrap_key_track_method(proxy_cls, '__len__', LENGTH_KEY, patched_track_methods)
+
+        def append(self: List[Any], value: Any) -> None:
+            original = get_raw(self)
+            original.append(value)
+            trigger_reactive_keys(self, (len(original) - 1, REACTIVITY_VALUE, LENGTH_KEY))
+
+        def extend(self: List[Any], values: Any) -> None:
+            original = get_raw(self)
+            length = len(original)
+            original.extend(values)
+            trigger_reactive_keys(self, [*range(length, len(original)), REACTIVITY_VALUE, LENGTH_KEY])
+
+        def pop(self: List[Any], index: int = -1) -> Any:
+            original = get_raw(self)
+            length = len(original)
+            result = original.pop(index)
+            if index in (-1, length - 1):
+                # Popping the last item does not shift the others.
+                trigger_reactive_keys(self, (length - 1, REACTIVITY_VALUE, LENGTH_KEY))
+            else:
+                trigger_reactive_all(self)
+            return result
+
+        def __iadd__(self: List[Any], values: Any) -> List[Any]:
+            extend(self, values)
+            return self
+
+        for method in (append, extend, pop, __iadd__):
+            if hasattr(proxy_cls, method.__name__) and method.__name__ not in patched_trigger_methods:
+                setattr(proxy_cls, method.__name__, method)
+                patched_trigger_methods.add(method.__name__)
+
+    @staticmethod
+    def wrap_set_key_methods(proxy_cls: type, patched_track_methods: Set[str], patched_trigger_methods: Set[str]):
+        get_raw = get_raw_getter(proxy_cls)
+        ProxyMetaClass.wrap_key_track_method(proxy_cls, '__len__', LENGTH_KEY, patched_track_methods)
+        ProxyMetaClass.wrap_contains_method(proxy_cls, patched_track_methods)
+
+        def add(self: Set[Any], element: Any) -> None:
+            original = get_raw(self)
+            if element in original:
+                return
+            original.add(element)
+            trigger_reactive_added_key(self, element)
+
+        def remove(self: Set[Any], element: Any) -> None:
+            original = get_raw(self)
+            original.remove(element)
+            trigger_reactive_added_key(self, _get_set_element_key(element))
+
+        def discard(self: Set[Any], element: Any) -> None:
+            original = get_raw(self)
+            if element not in original:
+                return
+            original.discard(element)
+            trigger_reactive_added_key(self, _get_set_element_key(element))
+
+        def pop(self: Set[Any]) -> Any:
+            original = get_raw(self)
+            element = original.pop()
+            trigger_reactive_added_key(self, element)
+            return element
+
+        def update(self: Set[Any], *others: Any) -> None:
+            original = get_raw(self)
+            added = [element for other in others for element in other if element not in original]
+            original.update(added)
+            if added:
+                trigger_reactive_keys(self, [*added, REACTIVITY_VALUE, ITERATE_KEY, LENGTH_KEY])
+
+        for method in (add, remove, discard, pop, update):
+            if hasattr(proxy_cls, method.__name__) and method.__name__ not in patched_trigger_methods:
+                setattr(proxy_cls, method.__name__, method)
+                patched_trigger_methods.add(method.__name__)
+
+    @staticmethod
+    def wrap_dict_get_method(proxy_cls: type, patched_track_methods: Set[str], shallow: bool = False):
+        get_raw = get_raw_getter(proxy_cls)
         if hasattr(proxy_cls, 'get'):  # Fool-proofing
 
             def get(self: Dict[Any, Any], key: Any, default: Any = None):
-                original = to_raw(self)
-                track_reactive_value(self)
-                if DEBUG:
-                    print(
-                        f'''[Reactive] track(get): key={key}, default={default}, self={repr(self)} at {hex(id(self))} ({id(self)})'''
-                    )
+                original = get_raw(self)
+                track_reactive_key(self, key)
                 result = original.get(key, default)
-                return result.value if is_ref(result) else reactive(result)
+                if shallow:
+                    return result
+                return result.value if is_ref(result) else _get_reactive_child(self, key, result)
 
             setattr(proxy_cls, 'get', get)
             patched_track_methods.add('get')
 
     @staticmethod
-    def wrap_dict_view_method(proxy_cls: type, patched_track_methods: Set[str]):
+    def wrap_dict_view_method(proxy_cls: type, patched_track_methods: Set[str], shallow: bool = False):
+        get_raw = get_raw_getter(proxy_cls)
         if hasattr(proxy_cls, 'items'):  # Fool-proofing
 
-            def items(self: Dict[T, U]) -> dict_items[T, U]:
-                original: Dict[T, U] = to_raw(self)
+            def items(self: Dict[T, U]) -> ItemsView[T, U]:
+                original: Dict[T, U] = get_raw(self)
                 track_reactive_value(self)
-                if DEBUG:
-                    print(f'''[Reactive] track(items): self={repr(self)} at {hex(id(self))} ({id(self)})''')
-                return dict_items(original)
+                return original.items() if shallow else dict_items(original)
 
             setattr(proxy_cls, 'items', items)
             patched_track_methods.add('items')
 
         if hasattr(proxy_cls, 'values'):
 
-            def values(self: Dict[Any, U]) -> dict_values[U]:
-                original: Dict[Any, U] = to_raw(self)
+            def values(self: Dict[Any, U]) -> ValuesView[U]:
+                original: Dict[Any, U] = get_raw(self)
                 track_reactive_value(self)
-                if DEBUG:
-                    print(f'''[Reactive] track(values): self={repr(self)} at {hex(id(self))} ({id(self)})''')
-                return dict_values(original)
+                return original.values() if shallow else dict_values(original)
 
             setattr(proxy_cls, 'values', values)
             patched_track_methods.add('values')
 
 
-@overload
-def reactive(instance: Dict[U, Any]) -> Dict[U, Any]:
-    ...
+class ReadonlyProxyMetaClass(ProxyMetaClass):
+    '''
+    The metaclass of the readonly proxies, whose methods forward the reads to the target and reject the mutations.
+
+    The reads are not tracked by the readonly proxy itself. If the target is a reactive object, the reads are
+    tracked by the target, otherwise nothing is tracked at all, as the data cannot be changed through the proxy.
+    '''
+
+    def __new__(cls,
+                name: str,
+                bases: Tuple[type, ...],
+                attrs: Dict[str, Any],
+                shallow: bool = False) -> Optional[type]:
+        proxy_cls = cls.new_proxy_class(name, bases, attrs)
+        get_raw = get_raw_getter(proxy_cls)
+        track_methods, trigger_methods = cls.get_method_names(proxy_cls)
+        type_name = bases[0].__name__
+        # The values read out of a (deeply) readonly proxy are readonly as well.
+        to_value: Callable[[Any], Any] = (lambda value: value) if shallow else _unref_and_readonly
+
+        for method_name in track_methods:
+            cls.wrap_readonly_method(proxy_cls, method_name, get_raw)
+        for method_name in trigger_methods | {'__setitem__', '__delitem__'}:
+            if hasattr(proxy_cls, method_name):
+                cls.wrap_rejected_method(proxy_cls, method_name, type_name)
+
+        is_list, is_dict, is_set = cls.get_container_kinds(proxy_cls)
+        to_item: Callable[[Any], Any] = _to_readonly_item if is_list and not shallow else to_value
+
+        if hasattr(proxy_cls, '__getitem__'):
+
+            def __getitem__(self: Any, key: Any) -> Any:
+                return to_item(get_raw(self)[key])
+
+            setattr(proxy_cls, '__getitem__', __getitem__)
+            track_methods.add('__getitem__')
+
+        if not shallow and not is_dict:
+            # The items iterated over are readonly as well, while the keys of dicts are returned as is.
+            for method_name in ('__iter__', '__reversed__'):
+                if hasattr(proxy_cls, method_name):
+                    cls.wrap_readonly_items_method(proxy_cls, method_name, get_raw, to_item)
+                    track_methods.add(method_name)
+
+        if not shallow and hasattr(proxy_cls, 'copy') and (is_list or is_dict or is_set):
+
+            def copy(self: Any) -> Any:
+                target = get_raw(self)
+                if is_dict:
+                    return {key: to_value(value) for key, value in target.items()}
+                return [to_item(item) for item in target] if is_list else {to_item(item) for item in target}
+
+            setattr(proxy_cls, 'copy', copy)
+            track_methods.add('copy')
+
+        if is_dict:
+
+            def get(self: Dict[Any, Any], key: Any, default: Any = None) -> Any:
+                return to_value(get_raw(self).get(key, default))
+
+            def items(self: Dict[Any, Any]) -> ItemsView[Any, Any]:
+                target = get_raw(self)
+                return target.items() if shallow else readonly_dict_items(target)
+
+            def values(self: Dict[Any, Any]) -> ValuesView[Any]:
+                target = get_raw(self)
+                return target.values() if shallow else readonly_dict_values(target)
+
+            for method in (get, items, values):
+                setattr(proxy_cls, method.__name__, method)
+                track_methods.add(method.__name__)
+
+        raw__getattribute__ = getattr(proxy_cls, '__getattribute__')
+        raw_class = bases[0]
+        # attribute name -> whether it is a method or a property of the class, which is bound to the proxy
+        bound_attributes: Dict[str, bool] = {}
+
+        def __getattribute__(self: object, name: str) -> Any:
+            if name in track_methods or name in trigger_methods or (name.startswith('__') and name.endswith('__')):
+                return raw__getattribute__(self, name)
+            is_bound = bound_attributes.get(name)
+            if is_bound is None:
+                is_bound = bound_attributes[name] = isinstance(getattr(raw_class, name, None),
+                                                               (types.FunctionType, property))
+            # Methods and properties are bound to the readonly proxy, so they cannot mutate the target either.
+            if is_bound:
+                return raw__getattribute__(self, name)
+            return to_value(getattr(get_raw(self), name))
+
+        def __setattr__(self: object, name: str, value: Any) -> None:
+            raise AttributeError(f'Cannot set attribute {name!r} of a readonly {type_name} object.')
+
+        def __delattr__(self: object, name: str) -> None:
+            raise AttributeError(f'Cannot delete attribute {name!r} of a readonly {type_name} object.')
+
+        def __dir__(self: object) -> Any:
+            return dir(get_raw(self))
+
+        for method in (__getattribute__, __setattr__, __delattr__, __dir__):
+            setattr(proxy_cls, method.__name__, method)
+
+        setattr(proxy_cls, FLAG_OF_READONLY, True)
+        return proxy_cls
+
+    @staticmethod
+    def wrap_readonly_items_method(proxy_cls: type, method_name: str, get_raw: Callable[[Any], Any],
+                                   to_item: Callable[[Any], Any]) -> None:
+
+        def wrapper(self: object) -> Iterator[Any]:
+            for item in getattr(get_raw(self), method_name)():
+                yield to_item(item)
+
+        setattr(proxy_cls, method_name, wrapper)
+
+    @staticmethod
+    def wrap_readonly_method(proxy_cls: type, method_name: str, get_raw: Callable[[Any], Any]) -> None:
+
+        def wrapper(self: object, *args: Any, **kwargs: Any):
+            return getattr(get_raw(self), method_name)(*args, **kwargs)
+
+        setattr(proxy_cls, method_name, wrapper)
+
+    @staticmethod
+    def wrap_rejected_method(proxy_cls: type, method_name: str, type_name: str) -> None:
+
+        def wrapper(self: object, *args: Any, **kwargs: Any):
+            raise TypeError(f'Cannot call {method_name}() of a readonly {type_name} object.')
+
+        setattr(proxy_cls, method_name, wrapper)
 
 
 @overload
-def reactive(instance: T) -> T:
+def reactive(instance: Dict[U, Any], equals: Union[Equals, None] = None) -> Dict[U, Any]:
     ...
 
 
-def reactive(instance: T) -> T:
+@overload
+def reactive(instance: T, equals: Union[Equals, None] = None) -> T:
+    ...
 
-    # If the instance is None, return None
-    if instance is None:
-        return instance
 
-    # If the instance is a callable, return it directly
-    if callable(instance):
+# How `reactive()` handles the instances of a type, see `__classify_type()`. The types are weakly referenced, so that
+# the classes created on the fly are not kept alive by the cache.
+__type_kind_cache: 'weakref.WeakKeyDictionary[type, int]' = weakref.WeakKeyDictionary()
+
+
+def __classify_type(t: type) -> int:
+    '''Classify a type once, so that `reactive()` does not probe every instance of it.'''
+    # None and immutable objects
+    if t is type(None) or issubclass(t, immutable_builtin_types):
+        return TYPE_KIND_SKIP
+    # Reactive objects
+    if t in reactive_reversed_class_map:
+        return TYPE_KIND_SKIP
+    # Refs, or the types with the skip flag
+    flags = get_type_flags(t)
+    if FLAG_OF_REF in flags or FLAG_OF_SKIP in flags:
+        return TYPE_KIND_SKIP
+    # Callables (e.g. functions, methods and classes)
+    if any('__call__' in c.__dict__ for c in t.__mro__):
+        return TYPE_KIND_SKIP
+    # Only the instances with `__dict__` can have the skip flag on their own.
+    return TYPE_KIND_CHECK if t.__dictoffset__ else TYPE_KIND_PROXY
+
+
+def reactive(instance: T, equals: Union[Equals, None] = None) -> T:
+    '''
+    Create a reactive object, whose keys (or attributes) are reactive, and whose nested values are made reactive when
+    they are read.
+
+    Args:
+        instance: The object to be made reactive. If it has already been reactive, the reactive object is returned.
+        equals: How the writes compare the new values with the old ones, the effects run only if they are not equal:
+            `'identity'`, `'eq'`, `'never'` or a function called with the new and the old values. Defaults to
+            comparing by identity first, then with `==` unless one of the values is a container (e.g. a list).
+            It is kept for the original object as long as it lives, so it applies to the writes through all its
+            reactive and shallow reactive objects (including the ones created later), not the nested objects. A
+            ValueError is raised if another strategy has already been set for the object.
+
+    Returns:
+        The reactive object.
+    '''
+    if equals is not None:
+        return __reactive_with_equals(instance, equals, False)
+
+    t = type(instance)
+    kind = __type_kind_cache.get(t)
+    if kind is None:
+        kind = __type_kind_cache[t] = __classify_type(t)
+    if kind == TYPE_KIND_SKIP:
         return instance
 
-    # If the instance is a ref object, return it directly
-    if is_ref(instance):
+    # If the instance has skip flag, return it directly
+    if kind == TYPE_KIND_CHECK and hasattr(instance, FLAG_OF_SKIP):
         return instance
 
     # If the instance is marked as raw, return it directly
     if is_marked_raw(instance):
         return instance
 
-    # If the instance has skip flag, return it directly
-    if hasattr(instance, FLAG_OF_SKIP):
-        return instance
-
-    # If the instance is already reactive, return it directly
-    if is_reactive(instance):
-        return instance
-
-    # If the instance is immutable, return it directly
-    if isinstance(instance, immutable_builtin_types):
-        # raise TypeError(
-        #     f'TypeError: You can only make a mutable object reactive. The type of {instance} is {type(instance)}.')
-        return instance
-
     # If the instance has already been reactive, return the reactive version of it directly
-    if is_in_global_reactive_object_map(instance):
-        return get_global_reactive_obj(instance)
+    observed = get_global_reactive_obj(instance)
+    if observed is not None:
+        return observed
 
     return __create_proxy(instance)
 
 
-def get_patched_class(instance: object):
-    raw_class = instance.__class__
-    if raw_class not in reactive_class_map:
+def __reactive_with_equals(instance: T, equals: Equals, shallow: bool) -> T:
+    equals_function = get_equals_function(equals)
+    observed = shallow_reactive(instance) if shallow else reactive(instance)
+    if type(observed) not in reactive_reversed_class_map or is_readonly(observed):
+        return observed
+    original = to_raw(observed)
+    explicit_equals = get_explicit_equals(original)
+    if explicit_equals is None:
+        set_explicit_equals(original, equals_function)
+    elif explicit_equals is not equals_function:
+        # The strategy is shared by all the users of the object, changing it would change their writes as well.
+        raise ValueError(f'The {type(original).__name__} object is already reactive with another equality strategy '
+                         f'than {equals!r}.')
+    return observed
+
+
+def shallow_reactive(instance: T, equals: Union[Equals, None] = None) -> T:
+    '''
+    Create a shallow reactive object, whose top-level keys (or attributes) are reactive, while the nested values are
+    returned as is: they are neither made reactive nor unwrapped if they are refs.
+
+    Args:
+        instance: The object to be made reactive.
+        equals: How the writes compare the new values with the old ones, see `reactive()`.
+
+    Returns:
+        The shallow reactive object.
+    '''
+    if equals is not None:
+        return __reactive_with_equals(instance, equals, True)
+
+    t = type(instance)
+    kind = __type_kind_cache.get(t)
+    if kind is None:
+        kind = __type_kind_cache[t] = __classify_type(t)
+    if kind == TYPE_KIND_SKIP:
+        return instance
+    if kind == TYPE_KIND_CHECK and hasattr(instance, FLAG_OF_SKIP):
+        return instance
+    if is_marked_raw(instance):
+        return instance
+    observed = get_global_reactive_obj(instance, shallow=True)
+    if observed is not None:
+        return observed
+    return __create_proxy(instance, shallow=True)
+
+
+def __create_readonly(instance: T, shallow: bool) -> T:
+    t = type(instance)
+    if t in reactive_reversed_class_map:
+        # A readonly object of a reactive object is created, so that the reads are still tracked.
+        if is_readonly(instance):
+            return instance
+    else:
+        kind = __type_kind_cache.get(t)
+        if kind is None:
+            kind = __type_kind_cache[t] = __classify_type(t)
+        if kind == TYPE_KIND_SKIP:
+            return instance
+        if kind == TYPE_KIND_CHECK and hasattr(instance, FLAG_OF_SKIP):
+            return instance
+        if is_marked_raw(instance):
+            return instance
+    observed = get_global_reactive_obj(instance, shallow, readonly=True)
+    if observed is not None:
+        return observed
+    return __create_proxy(instance, shallow, readonly=True)
+
+
+def readonly(instance: T) -> T:
+    '''
+    Create a readonly proxy of an object (which can be a plain or a reactive object). Mutating the proxy raises a
+    TypeError (or an AttributeError for the attributes), and the nested values read out of it are readonly as well.
+
+    Reading a readonly proxy of a reactive object is tracked like reading the reactive object, while reading a
+    readonly proxy of a plain object is not tracked at all.
+
+    Args:
+        instance: The target object.
+
+    Returns:
+        The readonly proxy.
+    '''
+    return __create_readonly(instance, False)
+
+
+def shallow_readonly(instance: T) -> T:
+    '''
+    Create a shallow readonly proxy of an object. Only the top level is readonly, the nested values are returned as
+    is.
+
+    Args:
+        instance: The target object.
+
+    Returns:
+        The shallow readonly proxy.
+    '''
+    return __create_readonly(instance, True)
+
+
+def get_patched_class(instance: object, shallow: bool = False, readonly: bool = False):
+    return get_proxy_class(reactive_reversed_class_map.get(type(instance), type(instance)), shallow, readonly)
+
+
+def get_proxy_class(raw_class: type, shallow: bool = False, readonly: bool = False) -> type:
+    '''Return the proxy class of a class, which is created at the first time.'''
+    if readonly:
+        class_map = shallow_readonly_class_map if shallow else readonly_class_map
+    else:
+        class_map = shallow_reactive_class_map if shallow else reactive_class_map
+    if raw_class not in class_map:
         class_name = raw_class.__name__
-        reactive_class_map[raw_class] = types.new_class(class_name, (raw_class,), {'metaclass': ProxyMetaClass})
-        reactive_reversed_class_map[reactive_class_map[raw_class]] = raw_class
-    return reactive_class_map[raw_class]
+        class_map[raw_class] = types.new_class(class_name, (raw_class,), {
+            'metaclass': ReadonlyProxyMetaClass if readonly else ProxyMetaClass,
+            'shallow': shallow
+        })
+        reactive_reversed_class_map[class_map[raw_class]] = raw_class
+    return class_map[raw_class]
 
 
-def __create_proxy(instance: object):
-    if DEBUG:
-        print(f'[Reactive] create proxy: {instance}')
-    patched_class = get_patched_class(instance)
+def __create_proxy(instance: T, shallow: bool = False, readonly: bool = False) -> T:
+    patched_class = get_patched_class(instance, shallow, readonly)
     try:
         proxy = patched_class()
         if isinstance(instance, dict):
@@ -609,7 +1213,16 @@ def __create_proxy(instance: object):
         # If the class supports passing in an instance of itself and directly returning it, then use this feature to bypass the __new__ method。
         # Because we don't know what parameters to fill in for __new__, we can only try to directly pass in an instance of itself.
         proxy = patched_class(instance)
-    return record_new_reactive_obj(cast(object, instance), proxy)
+    return record_new_reactive_obj(cast(T, instance), cast(T, proxy), shallow, readonly)
+
 
+# The proxy classes of the builtin containers are created at import, instead of at the first use of each of them.
+for builtin_container_class in (dict, list, set, tuple):
+    get_proxy_class(builtin_container_class)
+    get_proxy_class(builtin_container_class, shallow=True)
+del builtin_container_class
 
-__all__ = ['is_reactive', 'mark_raw', 'reactive', 'to_raw', 'deep_to_raw']
+__all__ = [
+    'is_reactive', 'is_readonly', 'mark_raw', 'reactive', 'shallow_reactive', 'readonly', 'shallow_readonly', 'to_raw',
+    'deep_to_raw'
+]
@@ -1,78 +1,241 @@
 # pyright: reportMissingTypeStubs=false
 
-from typing import Any, Dict, Iterable, Set, TypeVar, Union, cast
+import sys
+import weakref
+from typing import Any, Callable, Dict, Iterable, Sequence, Tuple, TypeVar, Union, cast
 
-from reactivity.effect.definations import ReactiveEffectDef
-from reactivity.effect.utils import track_effects, trigger_effects
-from reactivity.effect.vars import active_effect_stack
-from reactivity.env import DEBUG
-from reactivity.flags import FLAG_OF_REACTIVE, REACTIVITY_VALUE
+from reactivity.effect.dep import Dep
+from reactivity.effect.utils import end_batch, start_batch, track_effects, trigger_effects
+from reactivity.effect.vars import get_active_effect
+from reactivity.equality import EqualsFunction, default_equals
+from reactivity.flags import (CHILDREN_OF_REACTIVE, DEPS_OF_REACTIVE, EQUALS_OF_REACTIVE, FLAG_OF_READONLY,
+                              FLAG_OF_SKIP, ITERATE_KEY, LENGTH_KEY, RAW_OF_REACTIVE, REACTIVITY_VALUE)
 
 T = TypeVar('T')
+V = TypeVar('V')
 
 reactive_class_map: Dict[type, type] = {}
+shallow_reactive_class_map: Dict[type, type] = {}
+readonly_class_map: Dict[type, type] = {}
+shallow_readonly_class_map: Dict[type, type] = {}
+# The proxy classes (including the readonly ones) -> the original classes.
 reactive_reversed_class_map: Dict[type, type] = {}
-reactive_deps_map: 'Dict[int, Dict[Union[str, int], Set[ReactiveEffectDef[Any]]]]' = {}
-
-__global_reactive_object_map: Dict[int, object] = {}
-__global_original_object_map: Dict[int, object] = {}
-
-__marked_raw_set: Set[int] = set()
+# A reactive object is released along with its original object and deps as soon as it is not referenced,
+# neither by the user nor by the deps of an effect. So the registries below must not keep anything alive.
+
+# id of the original object -> weak reference to the reactive object, removing the entry when the reactive object
+# is released. A reactive object keeps its original object alive, so the id cannot be reused while in the map.
+__global_reactive_object_map: 'Dict[int, weakref.ReferenceType[Any]]' = {}
+__global_shallow_reactive_object_map: 'Dict[int, weakref.ReferenceType[Any]]' = {}
+# The readonly objects are keyed by the id of their targets, which are either original objects or reactive objects.
+__global_readonly_object_map: 'Dict[int, weakref.ReferenceType[Any]]' = {}
+__global_shallow_readonly_object_map: 'Dict[int, weakref.ReferenceType[Any]]' = {}
+
+# id of the object marked as raw -> a weak reference removing the entry when the object is released, or a tuple
+# holding the object if it supports neither weak references nor attributes (e.g. a dict or a list), so that its id is
+# not reused. The objects held are swept from the map once nothing else references them.
+__marked_raw_map: Dict[int, Any] = {}
+# The size of the map at which the objects held by it are swept next.
+__marked_raw_sweep_size = 64
+
+# id of the original object -> (the holder of the object, the equality function set explicitly for it by `reactive()`
+# or `shallow_reactive()`). The holder is a weak reference or a tuple, as in the map of the objects marked as raw, so
+# the strategy lives as long as the original object instead of its reactive objects.
+__reactive_equals_map: Dict[int, Tuple[Any, EqualsFunction]] = {}
+__reactive_equals_sweep_size = 64
+
+
+def get_reactive_registries() -> Dict[str, Dict[int, Any]]:
+    '''Return the registries of the reactive objects and the objects marked as raw by name, for memory accounting.'''
+    return {
+        'reactive': __global_reactive_object_map,
+        'shallow_reactive': __global_shallow_reactive_object_map,
+        'readonly': __global_readonly_object_map,
+        'shallow_readonly': __global_shallow_readonly_object_map,
+        'marked_raw': __marked_raw_map,
+    }
 
 
 def is_reactive(obj: object) -> bool:
-    return hasattr(obj, FLAG_OF_REACTIVE)
+    t = type(obj)
+    if t not in reactive_reversed_class_map:
+        return False
+    if hasattr(t, FLAG_OF_READONLY):
+        # A readonly object is reactive only if it is created from a reactive object.
+        return is_reactive(object.__getattribute__(obj, RAW_OF_REACTIVE))
+    return True
 
 
 def is_reactive_multable_sequence(obj: object) -> bool:
     return hasattr(obj, '__setitem__') and hasattr(obj, '__getitem__') and is_reactive(obj)
 
 
-def __get_reactive_subscribers(obj: object, key: Union[str, int]) -> Set[ReactiveEffectDef[Any]]:
-    obj_id = id(obj)
-    if obj_id not in reactive_deps_map:
-        reactive_deps_map[obj_id] = {}
-    if key not in reactive_deps_map[obj_id]:
-        reactive_deps_map[obj_id][key] = set()
-    return reactive_deps_map[obj_id][key]
+def get_reactive_deps(obj: object) -> Dict[Any, Dep]:
+    '''Return the deps of a reactive object, keyed by the item key, the attribute name, or one of the special keys:
+    `REACTIVITY_VALUE` (the whole value), `ITERATE_KEY` (the keys) and `LENGTH_KEY` (the length).
+    '''
+    return object.__getattribute__(obj, DEPS_OF_REACTIVE)
+
+
+def __get_reactive_subscribers(obj: object, key: Any) -> Dep:
+    deps = get_reactive_deps(obj)
+    dep = deps.get(key)
+    if dep is None:
+        dep = deps[key] = Dep(target=obj, key=key)
+    return dep
 
 
-def track_reactive(obj: object, key: str) -> None:
-    if not active_effect_stack:
+def track_reactive(obj: object, key: Any) -> None:
+    active_effect = get_active_effect()
+    if active_effect is None:
         return
     deps = __get_reactive_subscribers(obj, key)
-    track_effects(deps)
+    track_effects(deps, active_effect)
 
 
 def track_reactive_value(obj: object) -> None:
     track_reactive(obj, REACTIVITY_VALUE)
 
 
-def trigger_reactive(obj: object, key: str) -> None:
-    subscribers = __get_reactive_subscribers(obj, key)
-    trigger_effects(subscribers)
+def track_reactive_key(obj: object, key: Any) -> None:
+    '''Track a key of a reactive object, or its whole value if the key is unhashable.'''
+    try:
+        hash(key)
+    except TypeError:
+        track_reactive_value(obj)
+    else:
+        track_reactive(obj, key)
+
+
+ReactiveChildren = Dict[Any, Tuple[Any, Any]]
+
+
+def get_reactive_children(obj: object) -> Union[ReactiveChildren, None]:
+    '''Return the values read out of a reactive object and their reactive objects, keyed by the item key or the
+    attribute name, None if no nested value has been read. The entries are removed when their keys are triggered.
+    '''
+    return object.__getattribute__(obj, CHILDREN_OF_REACTIVE)
+
+
+def __forget_reactive_children(obj: object, keys: Union[Sequence[Any], None] = None) -> None:
+    children = get_reactive_children(obj)
+    if not children:
+        return
+    if keys is None:
+        children.clear()
+        return
+    for key in keys:
+        try:
+            children.pop(key, None)
+        except TypeError:
+            # The unhashable keys are never cached.
+            pass
+
+
+def trigger_reactive(obj: object, key: Any) -> None:
+    __forget_reactive_children(obj, (key, ))
+    # Only the keys which have been tracked have deps, there is nothing to trigger for the others.
+    deps = get_reactive_deps(obj)
+    if not deps:
+        return
+    dep = deps.get(key)
+    if dep is not None:
+        trigger_effects(dep)
 
 
 def trigger_reactive_value(obj: object) -> None:
     trigger_reactive(obj, REACTIVITY_VALUE)
 
 
-def is_in_global_reactive_object_map(original: object) -> bool:
-    return id(original) in __global_reactive_object_map
+def trigger_reactive_keys(obj: object, keys: Sequence[Any]) -> None:
+    '''Trigger some keys of a reactive object, the effects depending on several of them run only once.'''
+    __forget_reactive_children(obj, keys)
+    deps = get_reactive_deps(obj)
+    if not deps:
+        return
+    start_batch()
+    try:
+        for key in keys:
+            dep = deps.get(key)
+            if dep is not None:
+                trigger_effects(dep)
+    finally:
+        end_batch()
+
+
+def trigger_reactive_added_key(obj: object, key: Any) -> None:
+    '''Trigger a key added to (or deleted from) a reactive object, which changes its keys and length as well.'''
+    trigger_reactive_keys(obj, (key, REACTIVITY_VALUE, ITERATE_KEY, LENGTH_KEY))
+
+
+def trigger_reactive_all(obj: object) -> None:
+    '''Trigger all the keys of a reactive object, for the changes whose affected keys are unknown.'''
+    __forget_reactive_children(obj)
+    deps = get_reactive_deps(obj)
+    if deps:
+        trigger_reactive_keys(obj, list(deps))
+
 
+def __get_object_map(shallow: bool, readonly: bool) -> 'Dict[int, weakref.ReferenceType[Any]]':
+    if readonly:
+        return __global_shallow_readonly_object_map if shallow else __global_readonly_object_map
+    return __global_shallow_reactive_object_map if shallow else __global_reactive_object_map
 
-def is_in_global_original_object_map(observed: object) -> bool:
-    return id(observed) in __global_original_object_map
 
+def get_global_reactive_obj(original: T, shallow: bool = False, readonly: bool = False) -> Union[T, None]:
+    '''Return the (shallow) reactive or readonly object of an original object, None if there is none.'''
+    object_map = __get_object_map(shallow, readonly)
+    observed_ref = object_map.get(id(original))
+    return None if observed_ref is None else observed_ref()
 
-def get_global_reactive_obj(original: T) -> T:
-    return cast(T, __global_reactive_object_map[id(original)])
+
+def __get_slot_getter(proxy_cls: type, name: str) -> Callable[[Any], Any]:
+    descriptor = proxy_cls.__dict__.get(name)
+    if descriptor is not None:
+        return descriptor.__get__
+    return lambda observed: object.__getattribute__(observed, name)
+
+
+def get_raw_getter(proxy_cls: type) -> Callable[[Any], Any]:
+    '''Return a function getting the original object of an instance of a reactive class.'''
+    return __get_slot_getter(proxy_cls, RAW_OF_REACTIVE)
+
+
+def get_equals_getter(proxy_cls: type) -> Callable[[Any], EqualsFunction]:
+    '''Return a function getting the equality function of an instance of a reactive class.'''
+    return __get_slot_getter(proxy_cls, EQUALS_OF_REACTIVE)
+
+
+def get_explicit_equals(original: object) -> Union[EqualsFunction, None]:
+    '''Return the equality function set explicitly for an original object, None if it has the default one.'''
+    entry = __reactive_equals_map.get(id(original))
+    return None if entry is None else entry[1]
+
+
+def set_explicit_equals(original: object, equals: EqualsFunction) -> None:
+    '''Set how the writes to the reactive objects of an original object compare the new values with the old ones,
+    including the reactive objects created later, see `reactive()`.
+    '''
+    global __reactive_equals_sweep_size
+    original_id = id(original)
+    try:
+        holder: Any = weakref.ref(original, lambda _: __reactive_equals_map.pop(original_id, None))
+    except TypeError:
+        if len(__reactive_equals_map) >= __reactive_equals_sweep_size:
+            __sweep_held_objects(__reactive_equals_map, lambda entry: entry[0])
+            __reactive_equals_sweep_size = max(64, 2 * len(__reactive_equals_map))
+        holder = (original, )
+    __reactive_equals_map[original_id] = (holder, equals)
+    for shallow in (False, True):
+        observed = get_global_reactive_obj(original, shallow)
+        if observed is not None:
+            object.__setattr__(observed, EQUALS_OF_REACTIVE, equals)
 
 
 def to_raw(observed: T) -> T:
-    observed_id = id(observed)
-    if observed_id in __global_original_object_map:
-        return cast(T, __global_original_object_map[observed_id])
+    # A readonly object may be created from a reactive object, so there may be two layers of proxies.
+    while type(observed) in reactive_reversed_class_map:
+        observed = object.__getattribute__(observed, RAW_OF_REACTIVE)
     return observed
 
 
@@ -109,22 +272,79 @@ def deep_to_raw(observed: T) -> T:
     return to_raw(observed)
 
 
-def record_new_reactive_obj(original: T, observed: T) -> T:
-    __global_reactive_object_map[id(original)] = observed
-    __global_original_object_map[id(observed)] = original
-    if DEBUG:
-        print(
-            f'record_new_reactive_obj: {original} at {hex(id(original))} ({id(original)}) -> {observed} at {hex(id(observed))} ({id(observed)})'
-        )
+def record_new_reactive_obj(original: T, observed: T, shallow: bool = False, readonly: bool = False) -> T:
+    object_map = __get_object_map(shallow, readonly)
+    # The reactive and the shallow reactive objects of the same original object share the deps, so that the changes
+    # made through one of them trigger the effects depending on the other. The readonly objects track nothing.
+    other = None if readonly else get_global_reactive_obj(original, not shallow)
+    object.__setattr__(observed, RAW_OF_REACTIVE, original)
+    object.__setattr__(observed, DEPS_OF_REACTIVE, {} if other is None else get_reactive_deps(other))
+    object.__setattr__(observed, EQUALS_OF_REACTIVE, get_explicit_equals(original) or default_equals)
+    object.__setattr__(observed, CHILDREN_OF_REACTIVE, None)
+    original_id = id(original)
+
+    def remove(observed_ref: 'weakref.ReferenceType[Any]') -> None:
+        if object_map.get(original_id) is observed_ref:
+            del object_map[original_id]
+
+    try:
+        object_map[original_id] = weakref.ref(observed, remove)
+    except TypeError:
+        # e.g. the reactive objects of tuples, which do not support weak references. They are not cached, as
+        # they are immutable and cheap to create again.
+        pass
     return observed
 
 
+def __get_held_refcount(entry: Tuple[Any]) -> int:
+    return sys.getrefcount(entry[0])
+
+
+# The reference count of an object referenced by nothing but the tuple holding it, measured with the same function so
+# that it does not depend on how the interpreter counts the temporary references.
+__unreferenced_refcount = __get_held_refcount((object(), )) if hasattr(sys, 'getrefcount') else None
+
+
+def __sweep_held_objects(object_map: Dict[int, V], get_holder: Callable[[V], Any]) -> None:
+    '''Remove the entries whose holders are tuples holding objects which nothing else references.'''
+    if __unreferenced_refcount is None:
+        return
+    for instance_id, entry in list(object_map.items()):
+        holder = get_holder(entry)
+        if type(holder) is tuple and __get_held_refcount(cast(Tuple[Any], holder)) <= __unreferenced_refcount:
+            del object_map[instance_id]
+
+
+def __sweep_marked_raw_map() -> None:
+    global __marked_raw_sweep_size
+    __sweep_held_objects(__marked_raw_map, lambda entry: entry)
+    # Sweeping when the map doubles keeps marking an object amortized constant time.
+    __marked_raw_sweep_size = max(64, 2 * len(__marked_raw_map))
+
+
 def mark_raw(instance: T) -> T:
-    if DEBUG:
-        print(f'mark_raw: {instance} at {hex(id(instance))} ({id(instance)})')
-    __marked_raw_set.add(id(instance))
+    '''Mark an object so that it is never made reactive, and is returned as is when read out of reactive objects.
+
+    The skip flag is set on the objects with `__dict__`. The others are recorded by id, without being kept alive.
+    '''
+    t = type(instance)
+    if t.__dictoffset__ and not isinstance(instance, type):
+        try:
+            object.__setattr__(instance, FLAG_OF_SKIP, True)
+            return instance
+        except (AttributeError, TypeError):
+            pass
+    instance_id = id(instance)
+    if instance_id not in __marked_raw_map:
+        try:
+            __marked_raw_map[instance_id] = weakref.ref(instance, lambda _: __marked_raw_map.pop(instance_id, None))
+        except TypeError:
+            if len(__marked_raw_map) >= __marked_raw_sweep_size:
+                __sweep_marked_raw_map()
+            __marked_raw_map[instance_id] = (instance, )
     return instance
 
 
 def is_marked_raw(instance: object) -> bool:
-    return id(instance) in __marked_raw_set
+    '''Return whether an object is recorded as raw, the ones with the skip flag are checked by `reactive()` itself.'''
+    return id(instance) in __marked_raw_map
@@ -10,6 +10,9 @@ immutable_builtin_types = (
     bytes,
 )
 
+# The exact types of the values which are returned as is by `reactive()`, for checking them with a single lookup.
+immutable_scalar_types = frozenset((type(None), *immutable_builtin_types))
+
 immutable_but_containable_builtin_types = (cast(type, tuple),)
 
 mutable_builtin_types = (
@@ -25,3 +28,19 @@ supported_builtin_types = (
     *immutable_but_containable_builtin_types,
     *mutable_builtin_types,
 )
+
+# How `reactive()` handles the instances of a type:
+# returns them as is, e.g. immutable objects, callables and reactive objects
+TYPE_KIND_SKIP = 0
+# makes them reactive, e.g. dicts, lists and sets
+TYPE_KIND_PROXY = 1
+# makes them reactive, unless the instance has the skip flag, which needs an instance `__dict__`
+TYPE_KIND_CHECK = 2
+
+# How the `__getattribute__()` of a reactive object reads an attribute, classified once per class and name:
+# forwards it to the proxy without tracking, e.g. the magic and the patched methods
+ATTRIBUTE_KIND_MAGIC = 0
+# reads it from the original object, e.g. the instance attributes and the plain class attributes
+ATTRIBUTE_KIND_DATA = 1
+# binds it to the proxy, so that the reads made by the methods and properties are tracked
+ATTRIBUTE_KIND_BOUND = 2
@@ -1,12 +1,11 @@
 # pyright: reportMissingTypeStubs=false
 
-from typing import Any, Dict, Generic, Set, TypeVar, Union, cast, overload
+from typing import Any, Dict, Generic, TypeVar, Union, cast, overload
 
-from reactivity.computed.utils import is_computed_ref
-from reactivity.effect.definations import ReactiveEffectDef
+from reactivity.effect.dep import Dep
 from reactivity.effect.utils import track_effects, trigger_effects
-from reactivity.effect.vars import active_effect_stack
-from reactivity.env import DEBUG
+from reactivity.effect.vars import get_active_effect
+from reactivity.equality import Equals, EqualsFunction, get_equals_function, identity_equals
 from reactivity.flags import FLAG_OF_REF, REF_VALUE
 from reactivity.reactive import reactive
 from reactivity.reactive.utils import reactive_reversed_class_map, to_raw
@@ -26,48 +25,65 @@ def trigger_ref_value(obj: object) -> None:
 
 
 def track_ref(obj: object, key: str) -> None:
-    if not active_effect_stack:
+    active_effect = get_active_effect()
+    if active_effect is None:
         return
     if not hasattr(obj, 'deps'):
         return
-    if DEBUG:
-        print(f'[{"ComputedRef" if is_computed_ref(obj) else "Ref"}] track: self={obj} at {hex(id(obj))} ({id(obj)})')
-    deps: Dict[Union[str, int], Set[ReactiveEffectDef[Any]]] = getattr(obj, 'deps')
+    deps: Dict[Union[str, int], Dep] = getattr(obj, 'deps')
     if key not in deps:
-        deps[key] = set()
+        deps[key] = Dep(target=obj, key=key)
     dep = deps[key]
-    track_effects(dep)
+    track_effects(dep, active_effect)
 
 
-def trigger_ref(obj: object, key: str) -> None:
+def trigger_ref(obj: object, key: str = REF_VALUE) -> None:
+    '''
+    Trigger the effects depending on a ref.
+
+    It is called on a value change, and can be called to force the effects depending on a shallow ref to run after
+    its value has been mutated in place.
+
+    Args:
+        obj: The ref.
+        key: The key of the deps to trigger. Defaults to the value of the ref.
+    '''
     if not hasattr(obj, 'deps'):
         return
-    deps_dict: Dict[Union[str, int], Set[ReactiveEffectDef[Any]]] = getattr(obj, 'deps')
+    deps_dict: Dict[Union[str, int], Dep] = getattr(obj, 'deps')
     if key in deps_dict:
         trigger_effects(deps_dict[key])
-    if DEBUG:
-        print(f'[Ref] trigger: self={obj} at {hex(id(obj))} ({id(obj)})')
 
 
 class RefImpl(Generic[T]):
     __value: T
-    deps: Dict[Union[str, int], Set[ReactiveEffectDef[Any]]]
-
-    def __init__(self, value: T) -> None:
-        self.__value = to_raw(unref(value))
+    __shallow: bool
+    __equals: EqualsFunction
+    deps: Dict[Union[str, int], Dep]
+
+    def __init__(self, value: T, shallow: bool = False, equals: Union[Equals, None] = None) -> None:
+        self.__value = value if shallow else to_raw(unref(value))
+        self.__shallow = shallow
+        # Only replacing the value of a shallow ref is reactive, so its value is compared by identity by default.
+        self.__equals = get_equals_function(equals, identity_equals) if shallow else get_equals_function(equals)
         self.deps = {}
-        setattr(self, FLAG_OF_REF, True)
 
     @property
     def value(self) -> T:
         track_ref_value(self)
-        return reactive(self.__value)
+        return self.__value if self.__shallow else reactive(self.__value)
 
     @value.setter
     def value(self, value: T) -> None:
+        if self.__shallow:
+            if self.__equals(value, self.__value):
+                return
+            self.__value = value
+            trigger_ref_value(self)
+            return
         old_value = to_raw(self.__value)
         new_value = to_raw(unref(value))
-        if new_value == old_value:
+        if self.__equals(new_value, old_value):
             return
         self.__value = new_value
         trigger_ref_value(self)
@@ -79,34 +95,99 @@ class RefImpl(Generic[T]):
         return f'<Ref[{t.__name__}] value={self.__value}>'
 
 
+# The flag is set on the class, so that checking it is a type lookup.
+setattr(RefImpl, FLAG_OF_REF, True)
+
+
 @overload
-def ref() -> Ref[Any]:
+def ref(*, equals: Union[Equals, None] = None) -> Ref[Any]:
     ...
 
 
 @overload
-def ref(value: Ref[T]) -> Ref[T]:
+def ref(value: Ref[T], equals: Union[Equals, None] = None) -> Ref[T]:
     ...
 
 
 @overload
-def ref(value: None) -> Ref[Any]:
+def ref(value: None, equals: Union[Equals, None] = None) -> Ref[Any]:
     ...
 
 
 @overload
-def ref(value: T) -> Ref[T]:
+def ref(value: T, equals: Union[Equals, None] = None) -> Ref[T]:
     ...
 
 
-def ref(value: Union[Ref[T], T, None] = None) -> Ref[T]:
+def ref(value: Union[Ref[T], T, None] = None, equals: Union[Equals, None] = None) -> Ref[T]:
+    '''
+    Create a ref, whose value is made reactive when it is read.
+
+    Args:
+        value: The value of the ref. If it is a ref, it is returned directly.
+        equals: How a new value is compared with the old one, the effects run only if they are not equal:
+            `'identity'`, `'eq'`, `'never'` or a function called with the new and the old values. Defaults to
+            comparing by identity first, then with `==` unless one of the values is a container (e.g. a list).
+            A ValueError is raised if it is passed along with a ref, which keeps its own strategy.
+
+    Returns:
+        The ref.
+    '''
+    if is_ref(value):
+        if equals is not None:
+            raise ValueError(f'Cannot set the equality strategy of an existing ref, got {equals!r}.')
+        value = cast(Ref[T], value)
+        return value
+
+    value = cast(T, value)
+    result = RefImpl(value, equals=equals)
+    return cast(Ref[T], result)
+
+
+@overload
+def shallow_ref(*, equals: Union[Equals, None] = None) -> Ref[Any]:
+    ...
+
+
+@overload
+def shallow_ref(value: Ref[T], equals: Union[Equals, None] = None) -> Ref[T]:
+    ...
+
+
+@overload
+def shallow_ref(value: None, equals: Union[Equals, None] = None) -> Ref[Any]:
+    ...
+
+
+@overload
+def shallow_ref(value: T, equals: Union[Equals, None] = None) -> Ref[T]:
+    ...
+
+
+def shallow_ref(value: Union[Ref[T], T, None] = None, equals: Union[Equals, None] = None) -> Ref[T]:
+    '''
+    Create a shallow ref, whose value is returned as is instead of being made reactive.
+
+    Only replacing `.value` is reactive. After mutating the value in place, call `trigger_ref()` to run the effects
+    depending on the ref.
+
+    Args:
+        value: The value of the ref. If it is a ref, it is returned directly.
+        equals: How a new value is compared with the old one, see `ref()`. Defaults to `'identity'`. A ValueError is
+            raised if it is passed along with a ref.
+
+    Returns:
+        The shallow ref.
+    '''
     if is_ref(value):
+        if equals is not None:
+            raise ValueError(f'Cannot set the equality strategy of an existing ref, got {equals!r}.')
         value = cast(Ref[T], value)
         return value
 
     value = cast(T, value)
-    result = RefImpl(value)
+    result = RefImpl(value, shallow=True, equals=equals)
     return cast(Ref[T], result)
 
 
-__all__ = ['is_ref', 'ref', 'unref', 'deep_unref', 'Ref']
+__all__ = ['is_ref', 'ref', 'shallow_ref', 'trigger_ref', 'unref', 'deep_unref', 'Ref']
@@ -3,6 +3,7 @@
 from typing import Any, Dict, Iterable, TypeVar, Union, cast, overload
 
 from reactivity.flags import FLAG_OF_REF
+from reactivity.utils import has_type_flag
 
 from .definitions import Ref
 
@@ -10,7 +11,7 @@ T = TypeVar('T')
 
 
 def is_ref(obj: object) -> bool:
-    return hasattr(obj, FLAG_OF_REF)
+    return has_type_flag(obj, FLAG_OF_REF)
 
 
 @overload
@@ -1,7 +1,32 @@
 # pyright: reportMissingTypeStubs=false
 
-from reactivity.flags import FLAG_OF_READONLY
+import weakref
+from typing import FrozenSet
+
+from reactivity.flags import (FLAG_OF_COMPUTED_REF, FLAG_OF_REACTIVE, FLAG_OF_READONLY, FLAG_OF_REF, FLAG_OF_SKIP)
+
+type_flags = (FLAG_OF_REF, FLAG_OF_COMPUTED_REF, FLAG_OF_REACTIVE, FLAG_OF_READONLY, FLAG_OF_SKIP)
+
+# type -> the flags set on the class or one of its bases, not keeping the classes alive
+__type_flags_cache: 'weakref.WeakKeyDictionary[type, FrozenSet[str]]' = weakref.WeakKeyDictionary()
+
+
+def get_type_flags(t: type) -> FrozenSet[str]:
+    '''Return the flags of a type.
+
+    The flags are class attributes, found in the `__dict__` of the classes in the MRO once per type, so
+    checking them never runs the attribute hooks (e.g. `__getattr__`) of the objects.
+    '''
+    flags = __type_flags_cache.get(t)
+    if flags is None:
+        flags = frozenset(flag for flag in type_flags for c in t.__mro__ if c.__dict__.get(flag))
+        __type_flags_cache[t] = flags
+    return flags
+
+
+def has_type_flag(obj: object, flag: str) -> bool:
+    return flag in get_type_flags(type(obj))
 
 
 def is_readonly(obj: object) -> bool:
-    return hasattr(obj, FLAG_OF_READONLY)
+    return has_type_flag(obj, FLAG_OF_READONLY)
@@ -3,7 +3,10 @@
 from inspect import isfunction, signature
 from typing import (Any, Callable, Dict, List, Sequence, TypeVar, Union, cast, overload)
 
-from reactivity.effect import effect
+from reactivity.effect import ReactiveEffect
+from reactivity.effect.definations import EFFECT_KIND_WATCHER
+from reactivity.effect.scheduler import FLUSH_SYNC, check_flush_mode, create_scheduler
+from reactivity.reactive import reactive
 from reactivity.reactive.utils import is_reactive
 from reactivity.reactive.vars import immutable_builtin_types
 from reactivity.ref.definitions import Ref
@@ -24,24 +27,55 @@ def __get_fn_params_count(fn: Callable[..., Any]) -> int:
     return len(signature(fn).parameters)
 
 
+def __create_watcher_effect(fn: Callable[[], None], flush: str) -> ReactiveEffect[None]:
+    runner = ReactiveEffect(fn)
+    runner.kind = EFFECT_KIND_WATCHER
+    if flush != FLUSH_SYNC:
+        runner.scheduler = create_scheduler(runner, flush)
+    return runner
+
+
 @overload
-def watch_effect(update: Callable[[], Any]) -> StopHandle:
+def watch_effect(update: Callable[[], Any], *, flush: str = FLUSH_SYNC) -> StopHandle:
     ...
 
 
 @overload
-def watch_effect(update: Callable[[OnCleanup], Any]) -> StopHandle:
+def watch_effect(update: Callable[[OnCleanup], Any], *, flush: str = FLUSH_SYNC) -> StopHandle:
     ...
 
 
-def watch_effect(update: Union[Callable[[], Any], Callable[[OnCleanup], None]], **kwargs: Any) -> StopHandle:
-    default_kwargs: Dict[Any, Any] = {}
+def watch_effect(update: Union[Callable[[], Any], Callable[[OnCleanup], None]],
+                 *,
+                 flush: str = FLUSH_SYNC,
+                 **kwargs: Any) -> StopHandle:
+    '''
+    Run a function immediately, and re-run it when its dependencies change.
+
+    Args:
+        update: The function to run. It can accept an `on_cleanup` function to register a cleanup callback.
+
+    Keyword Args:
+        flush: When to re-run the function. `'sync'` runs it as soon as a dependency changes, `'pre'` and `'post'`
+            queue it until `flush_jobs()` is called, where the `pre` jobs run before the `post` jobs.
+            Defaults to `'sync'`. The first run always happens immediately.
+
+    Returns:
+        A function to stop watching.
+    '''
+    default_kwargs: Dict[Any, Any] = {
+        'flush': FLUSH_SYNC,
+    }
+    kwargs.update({
+        'flush': flush,
+    })
     for k in kwargs:
         if k not in default_kwargs:
             raise TypeError(f'Unknown keyword argument {k} for watch_effect().')
         if type(kwargs[k]) != type(default_kwargs[k]):
             raise TypeError(
                 f'The type of {k} must be {type(default_kwargs[k])} for watch_effect(), but got {type(kwargs[k])}.')
+    check_flush_mode(flush, 'watch_effect')
 
     stop_flag = False
 
@@ -49,7 +83,7 @@ def watch_effect(update: Union[Callable[[], Any], Callable[[OnCleanup], None]],
 
     cleanup_callback: Union[Callable[[], None], None] = None
 
-    def stop():
+    def on_stop():
         nonlocal stop_flag, cleanup_callback
 
         stop_flag = True
@@ -58,6 +92,9 @@ def watch_effect(update: Union[Callable[[], Any], Callable[[OnCleanup], None]],
             cleanup_callback()
             cleanup_callback = None
 
+    def stop():
+        runner.stop()
+
     def watch_effect_wrapper():
         nonlocal stop_flag
 
@@ -78,7 +115,9 @@ def watch_effect(update: Union[Callable[[], Any], Callable[[OnCleanup], None]],
             update_fn = cast(Callable[[OnCleanup], None], update)
             update_fn(cleanup)
 
-    effect(watch_effect_wrapper)
+    runner = __create_watcher_effect(watch_effect_wrapper, flush)
+    runner.on_stop = on_stop
+    runner.run()
 
     return stop
 
@@ -94,8 +133,9 @@ def __deeply_walk(obj: object) -> None:
             __deeply_walk(obj[k])
     elif isinstance(obj, (list, set)):
         obj = cast(Sequence[Any], obj)
+        # Iterating a reactive list or set returns the raw items, which must be made reactive to be tracked.
         for v in obj:
-            __deeply_walk(v)
+            __deeply_walk(reactive(v))
 
 
 @overload
@@ -105,6 +145,7 @@ def watch(
     *,
     deep: bool = False,
     immediate: bool = False,
+    flush: str = FLUSH_SYNC,
     **kwargs: Any,
 ) -> StopHandle:
     ...
@@ -116,6 +157,7 @@ def watch(source: Sequence[WatchSource[T]],
           *,
           deep: bool = False,
           immediate: bool = False,
+          flush: str = FLUSH_SYNC,
           **kwargs: Dict[Any, Any]) -> StopHandle:
     ...
 
@@ -125,6 +167,7 @@ def watch(source: Union[WatchSource[T], Sequence[WatchSource[T]]],
           *,
           deep: bool = False,
           immediate: bool = False,
+          flush: str = FLUSH_SYNC,
           **kwargs: Any) -> StopHandle:
     '''
     Watch a source and run a callback when the source changes.
@@ -136,6 +179,8 @@ def watch(source: Union[WatchSource[T], Sequence[WatchSource[T]]],
     Keyword Args:
         deep: Whether to watch the source deeply. Defaults to False.
         immediate: Whether to run the callback immediately. Defaults to False.
+        flush: When to run the callback. `'sync'` runs it as soon as the source changes, `'pre'` and `'post'` queue
+            it until `flush_jobs()` is called, where the `pre` jobs run before the `post` jobs. Defaults to `'sync'`.
     
     Returns:
         A function to stop watching.
@@ -143,10 +188,12 @@ def watch(source: Union[WatchSource[T], Sequence[WatchSource[T]]],
     default_kwargs = {
         'immediate': False,
         'deep': False,
+        'flush': FLUSH_SYNC,
     }
     kwargs.update({
         'immediate': immediate,
         'deep': deep,
+        'flush': flush,
     })
     for k in kwargs:
         if k not in default_kwargs:
@@ -156,12 +203,13 @@ def watch(source: Union[WatchSource[T], Sequence[WatchSource[T]]],
                 f'The type of {k} must be {type(default_kwargs[k])} for watch(), but got {type(kwargs[k])}.')
     immediate = kwargs.get('immediate', default_kwargs['immediate'])
     deep = kwargs.get('deep', default_kwargs['deep'])
+    check_flush_mode(flush, 'watch')
 
     stop_flag = False
 
     cleanup_callback: Union[Callable[[], None], None] = None
 
-    def stop():
+    def on_stop():
         nonlocal stop_flag, cleanup_callback
 
         stop_flag = True
@@ -170,6 +218,9 @@ def watch(source: Union[WatchSource[T], Sequence[WatchSource[T]]],
             cleanup_callback()
             cleanup_callback = None
 
+    def stop():
+        runner.stop()
+
     if isinstance(source, Sequence):
         source = cast(Sequence[WatchSource[T]], source)
         if is_reactive(source):
@@ -293,7 +344,9 @@ def watch(source: Union[WatchSource[T], Sequence[WatchSource[T]]],
             if is_first_run:
                 is_first_run = False
 
-    effect(watch_wrapper)
+    runner = __create_watcher_effect(watch_wrapper, flush)
+    runner.on_stop = on_stop
+    runner.run()
 
     return stop
 
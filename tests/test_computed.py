@@ -1,4 +1,5 @@
-from reactivity import effect, reactive, computed
+import pytest
+from reactivity import effect, reactive, computed, ref
 from reactivity.effect import ReactiveEffect
 
 
@@ -175,3 +176,154 @@ def test_expose_value_when_stopped():
     x_effect: ReactiveEffect = getattr(x, 'effect')
     x_effect.stop()
     assert x.value == 1
+
+
+# should run the effects of a diamond dependency graph once with consistent values
+def test_run_the_effects_of_a_diamond_dependency_graph_once_with_consistent_values():
+    a = ref(1)
+    b = computed(lambda: a.value + 1)
+    c = computed(lambda: a.value * 2)
+    seen = []
+
+    def d():
+        seen.append((b.value, c.value))
+
+    effect(d)
+    assert seen == [(2, 2)]
+    a.value = 2
+    assert seen == [(2, 2), (3, 4)]
+    a.value = 3
+    assert seen == [(2, 2), (3, 4), (4, 6)]
+
+
+# should run an effect depending on a source and its computed once
+def test_run_an_effect_depending_on_a_source_and_its_computed_once():
+    a = ref(1)
+    double = computed(lambda: a.value * 2)
+    seen = []
+
+    def func():
+        seen.append((a.value, double.value))
+
+    effect(func)
+    a.value = 2
+    assert seen == [(1, 2), (2, 4)]
+
+
+# should evaluate each computed of a deep diamond once per change
+def test_evaluate_each_computed_of_a_deep_diamond_once_per_change():
+    a = ref(0)
+    calls = {'b': 0, 'c': 0, 'd': 0, 'e': 0}
+
+    def b_getter():
+        calls['b'] += 1
+        return a.value + 1
+
+    def c_getter():
+        calls['c'] += 1
+        return b.value * 2
+
+    def d_getter():
+        calls['d'] += 1
+        return b.value * 3
+
+    def e_getter():
+        calls['e'] += 1
+        return c.value + d.value
+
+    b = computed(b_getter)
+    c = computed(c_getter)
+    d = computed(d_getter)
+    e = computed(e_getter)
+    seen = []
+
+    effect(lambda: seen.append(e.value))
+    assert seen == [5]
+    a.value = 1
+    assert seen == [5, 10]
+    assert calls == {'b': 2, 'c': 2, 'd': 2, 'e': 2}
+
+
+# should not re-run the computeds and effects downstream of an unchanged computed
+def test_not_rerun_the_computeds_and_effects_downstream_of_an_unchanged_computed():
+    n = ref(0)
+    calls = {'parity': 0, 'label': 0, 'effect': 0}
+
+    def parity_getter():
+        calls['parity'] += 1
+        return n.value % 2
+
+    def label_getter():
+        calls['label'] += 1
+        return 'odd' if parity.value else 'even'
+
+    parity = computed(parity_getter)
+    label = computed(label_getter)
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        calls['effect'] += 1
+        dummy = label.value
+
+    effect(func)
+    assert dummy == 'even'
+    assert calls == {'parity': 1, 'label': 1, 'effect': 1}
+
+    # parity is re-computed, but its value is unchanged
+    n.value = 2
+    assert dummy == 'even'
+    assert calls == {'parity': 2, 'label': 1, 'effect': 1}
+
+    n.value = 3
+    assert dummy == 'odd'
+    assert calls == {'parity': 3, 'label': 2, 'effect': 2}
+
+
+# should validate a dirty computed lazily without re-computing
+def test_validate_a_dirty_computed_lazily_without_recomputing():
+    n = ref(1)
+    calls = 0
+
+    def getter():
+        nonlocal calls
+        calls += 1
+        return n.value > 0
+
+    positive = computed(getter)
+    double = computed(lambda: positive.value * 2)
+    assert double.value == 2
+    n.value = 5
+    assert double.value == 2
+    assert calls == 2
+    # nothing has changed since the last read
+    assert double.value == 2
+    assert calls == 2
+
+
+# should evaluate again after the getter raised
+def test_evaluate_again_after_the_getter_raised():
+    n = ref(0)
+    c = computed(lambda: 1 // n.value)
+    with pytest.raises(ZeroDivisionError):
+        c.value
+    n.value = 1
+    assert c.value == 1
+    n.value = 0
+    with pytest.raises(ZeroDivisionError):
+        c.value
+    with pytest.raises(ZeroDivisionError):
+        c.value
+
+
+# should still run the other effects of a flush when a computed raises while it is refreshed
+def test_still_run_the_other_effects_when_a_computed_raises_while_refreshed():
+    n = ref(1)
+    c = computed(lambda: 1 // n.value)
+    seen = []
+    effect(lambda: seen.append(('a', c.value)))
+    effect(lambda: seen.append(('b', n.value)))
+    assert seen == [('a', 1), ('b', 1)]
+    with pytest.raises(ZeroDivisionError):
+        n.value = 0
+    assert seen == [('a', 1), ('b', 1), ('b', 0)]
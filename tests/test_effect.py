@@ -1,4 +1,14 @@
-from reactivity import effect, reactive
+import asyncio
+import gc
+import json
+import sys
+import threading
+import weakref
+
+from reactivity import (ReactiveEffect, batch, computed, disable_profiling, effect, effect_scope, enable_profiling,
+                        flush_jobs, get_current_scope, get_dependency_graph, next_tick, on_effect_run, on_scope_dispose,
+                        on_track, on_trigger, reactive, ref, set_run_budget, stats, to_raw, use_asyncio_scheduler,
+                        watch, watch_effect)
 import pytest
 
 
@@ -192,6 +202,138 @@ def test_observe_sparse_array_mutations():
     assert dummy == 'Hello'
 
 
+# should only re-run the effects depending on the written key
+def test_only_rerun_the_effects_depending_on_the_written_key():
+    obj = reactive({'a': 1, 'b': 2})
+    a_calls = 0
+    b_calls = 0
+
+    def a_spy():
+        nonlocal a_calls
+        a_calls += 1
+        obj.get('a')
+
+    def b_spy():
+        nonlocal b_calls
+        b_calls += 1
+        obj['b']
+
+    effect(a_spy)
+    effect(b_spy)
+    obj['a'] = 3
+    assert a_calls == 2
+    assert b_calls == 1
+    obj['b'] = 4
+    assert a_calls == 2
+    assert b_calls == 2
+    # Adding or deleting other keys does not change the tracked ones.
+    obj['c'] = 5
+    del obj['c']
+    assert a_calls == 2
+    assert b_calls == 2
+    del obj['a']
+    assert a_calls == 3
+    assert b_calls == 2
+
+
+# should track the keys and the length of a dict separately
+def test_track_the_keys_and_the_length_of_a_dict_separately():
+    obj = reactive({'a': 1})
+    keys = None
+    length = None
+    has_b = None
+
+    def keys_spy():
+        nonlocal keys
+        keys = list(obj)
+
+    def length_spy():
+        nonlocal length
+        length = len(obj)
+
+    def has_b_spy():
+        nonlocal has_b
+        has_b = 'b' in obj
+
+    effect(keys_spy)
+    effect(length_spy)
+    effect(has_b_spy)
+    assert keys == ['a']
+    assert length == 1
+    assert has_b is False
+    obj['b'] = 2
+    assert keys == ['a', 'b']
+    assert length == 2
+    assert has_b is True
+    obj.update({'a': 3, 'c': 4})
+    assert keys == ['a', 'b', 'c']
+    assert length == 3
+    assert obj.pop('b') == 2
+    assert keys == ['a', 'c']
+    assert length == 2
+    assert has_b is False
+    obj.setdefault('b', 5)
+    assert has_b is True
+    obj.clear()
+    assert keys == []
+    assert length == 0
+    assert has_b is False
+
+
+# should track the items and the length of a list separately
+def test_track_the_items_and_the_length_of_a_list_separately():
+    lst = reactive([1, 2, 3])
+    first_calls = 0
+    length = None
+
+    def first_spy():
+        nonlocal first_calls
+        first_calls += 1
+        lst[0]
+
+    def length_spy():
+        nonlocal length
+        length = len(lst)
+
+    effect(first_spy)
+    effect(length_spy)
+    lst[1] = 4
+    lst.append(5)
+    lst.pop()
+    assert first_calls == 1
+    assert length == 3
+    lst[-3] = 0
+    assert first_calls == 2
+    # Inserting shifts the items, so the first item may change.
+    lst.insert(0, -1)
+    assert first_calls == 3
+    assert length == 4
+
+
+# should track the elements of a set separately
+def test_track_the_elements_of_a_set_separately():
+    s = reactive({1, 2})
+    calls = 0
+    dummy = None
+
+    def spy():
+        nonlocal calls, dummy
+        calls += 1
+        dummy = 3 in s
+
+    effect(spy)
+    assert dummy is False
+    s.add(4)
+    s.discard(1)
+    assert calls == 1
+    s.add(3)
+    assert dummy is True
+    assert calls == 2
+    s.remove(3)
+    assert dummy is False
+    assert calls == 3
+
+
 # should observe enumeration
 def test_observe_enumeration():
     dummy = 0
@@ -345,10 +487,6 @@ def test_not_be_triggered_by_raw_mutations():
 
 # should avoid implicit infinite recursive loops with itself
 def test_avoid_implicit_infinite_recursive_loops_with_itself():
-    # sourcery skip: remove-unreachable-code
-    # FIXME: Cannot pass this test.
-    # -- Zhaoji Wang 2023-01-11
-    return
     counter = reactive({'num': 0})
     counter_spy_calls = 0
 
@@ -365,12 +503,37 @@ def test_avoid_implicit_infinite_recursive_loops_with_itself():
     assert counter_spy_calls == 2
 
 
+# should drop the extra runs of the effects triggering each other endlessly
+def test_drop_extra_runs_of_effects_triggering_each_other_endlessly():
+    state = reactive({'a': 0, 'b': 0})
+
+    def ping():
+        state['b'] = state['a'] + 1
+
+    def pong():
+        state['a'] = state['b'] + 1
+
+    effect(ping)
+    set_run_budget(10)
+    try:
+        with pytest.warns(RuntimeWarning, match=r"p[io]ng .* dict\['[ab]'\]"):
+            effect(pong)
+        assert state['a'] <= 2 * 10 + 2
+        # The budget is counted per flush.
+        with pytest.warns(RuntimeWarning):
+            state['a'] = 0
+    finally:
+        set_run_budget()
+
+
+# should raise ValueError when the run budget is not positive
+def test_raise_value_error_when_run_budget_is_not_positive():
+    with pytest.raises(ValueError):
+        set_run_budget(0)
+
+
 # should discover new branches while running automatically
 def test_discover_new_branches_while_running_automatically():
-    # sourcery skip: remove-unreachable-code
-    # FIXME: Cannot pass this test.
-    # -- Zhaoji Wang 2023-01-11
-    return
     dummy = None
     obj = reactive({'prop': 'value', 'run': False})
     conditional_spy_calls = 0
@@ -419,10 +582,6 @@ def test_discover_new_branches_when_running_manually():
 
 # should not be triggered by mutating a property, which is used in an inactive branch
 def test_not_be_triggered_by_mutating_a_property_which_is_used_in_an_inactive_branch():
-    # sourcery skip: remove-unreachable-code
-    # FIXME: Cannot pass this test.
-    # -- Zhaoji Wang 2023-01-11
-    return
     dummy = None
     obj = reactive({'prop': 'value', 'run': True})
 
@@ -443,3 +602,598 @@ def test_not_be_triggered_by_mutating_a_property_which_is_used_in_an_inactive_br
     obj['prop'] = 'value2'
     assert dummy == 'other'
     assert conditional_spy_calls == 2
+
+
+# should clean up the deps of branches which are no longer reached
+def test_clean_up_the_deps_of_branches_which_are_no_longer_reached():
+    flag = ref(True)
+    prop = ref('value')
+    dummy = None
+
+    conditional_spy_calls = 0
+
+    def conditional_spy():
+        nonlocal dummy, conditional_spy_calls
+        conditional_spy_calls += 1
+        dummy = prop.value if flag.value else 'other'
+
+    runner = effect(conditional_spy)
+
+    assert dummy == 'value'
+    assert conditional_spy_calls == 1
+    assert len(runner.deps) == 2
+    flag.value = False
+    assert dummy == 'other'
+    assert conditional_spy_calls == 2
+    assert len(runner.deps) == 1
+    prop.value = 'value2'
+    assert dummy == 'other'
+    assert conditional_spy_calls == 2
+    flag.value = True
+    assert dummy == 'value2'
+    assert conditional_spy_calls == 3
+    prop.value = 'value3'
+    assert dummy == 'value3'
+    assert conditional_spy_calls == 4
+
+
+# should unsubscribe from all deps when stopped
+def test_unsubscribe_from_all_deps_when_stopped():
+    a = ref(1)
+    b = ref(2)
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        dummy = a.value + b.value + a.value
+
+    runner = effect(func)
+    assert dummy == 4
+    deps = list(runner.deps)
+    assert len(deps) == 2
+    assert all(runner in dep.subs for dep in deps)
+
+    runner.stop()
+    assert len(runner.deps) == 0
+    assert all(runner not in dep.subs for dep in deps)
+    a.value = 10
+    assert dummy == 4
+
+
+# should run the triggered effects once when the batch ends
+def test_run_the_triggered_effects_once_when_the_batch_ends():
+    state = reactive({'a': 0, 'b': 0})
+    dummy = None
+    calls = 0
+
+    def func():
+        nonlocal dummy, calls
+        calls += 1
+        dummy = state['a'] + state['b']
+
+    effect(func)
+    assert calls == 1
+
+    with batch():
+        for i in range(200):
+            state['a'] = i
+            state['b'] = i
+        assert dummy == 0
+        assert calls == 1
+    assert dummy == 398
+    assert calls == 2
+
+
+# should flush when the outermost batch ends
+def test_flush_when_the_outermost_batch_ends():
+    count = ref(0)
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        dummy = count.value
+
+    effect(func)
+
+    with batch():
+        count.value = 1
+        with batch():
+            count.value = 2
+        assert dummy == 0
+        count.value = 3
+    assert dummy == 3
+
+
+# should keep computed values up to date inside a batch
+def test_keep_computed_values_up_to_date_inside_a_batch():
+    count = ref(1)
+    double = computed(lambda: count.value * 2)
+    calls = 0
+
+    def cb():
+        nonlocal calls
+        calls += 1
+
+    watch(double, cb)
+
+    with batch():
+        count.value = 2
+        assert double.value == 4
+        count.value = 3
+        assert double.value == 6
+    assert calls == 1
+
+
+# should batch as a decorator
+def test_batch_as_a_decorator():
+    count = ref(0)
+    calls = 0
+
+    def func():
+        nonlocal calls
+        calls += 1
+        count.value
+
+    effect(func)
+
+    @batch
+    def increase(n: int):
+        for _ in range(n):
+            count.value += 1
+        return count.value
+
+    @batch()
+    def decrease(n: int):
+        for _ in range(n):
+            count.value -= 1
+
+    assert increase(10) == 10
+    assert calls == 2
+    decrease(5)
+    assert count.value == 5
+    assert calls == 3
+
+
+# should flush the batch when an exception is raised
+def test_flush_the_batch_when_an_exception_is_raised():
+    count = ref(0)
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        dummy = count.value
+
+    effect(func)
+
+    with pytest.raises(ValueError):
+        with batch():
+            count.value = 1
+            raise ValueError()
+    assert dummy == 1
+
+
+# should queue the effect until the jobs are flushed
+def test_queue_the_effect_until_the_jobs_are_flushed():
+    count = ref(0)
+    calls = 0
+
+    def func():
+        nonlocal calls
+        calls += 1
+        count.value
+
+    effect(func, flush='pre')
+    assert calls == 1
+    count.value += 1
+    count.value += 1
+    assert calls == 1
+    flush_jobs()
+    assert calls == 2
+
+
+def run_until_complete(coro):
+    # `asyncio.run()` is not available on Python 3.6.
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+# should flush the jobs once per event loop iteration with the asyncio scheduler
+def test_flush_the_jobs_once_per_event_loop_iteration_with_the_asyncio_scheduler():
+    count = ref(0)
+    calls = []
+
+    def func():
+        calls.append(count.value)
+
+    async def main():
+        effect(func, flush='pre')
+        for _ in range(100):
+            count.value += 1
+        assert calls == [0]
+        await next_tick()
+        assert calls == [0, 100]
+        count.value += 1
+        await asyncio.sleep(0)
+        assert calls == [0, 100, 101]
+
+    use_asyncio_scheduler()
+    try:
+        run_until_complete(main())
+    finally:
+        use_asyncio_scheduler(False)
+
+
+# should flush the jobs right away on next_tick without the asyncio scheduler
+def test_flush_the_jobs_right_away_on_next_tick_without_the_asyncio_scheduler():
+    count = ref(0)
+    calls = 0
+
+    def func():
+        nonlocal calls
+        calls += 1
+        count.value
+
+    async def main():
+        effect(func, flush='post')
+        count.value += 1
+        assert calls == 1
+        await next_tick()
+        assert calls == 2
+
+    run_until_complete(main())
+
+
+# should not share the batches between threads
+def test_not_share_the_batches_between_threads():
+    writes = 5000
+    results = []
+
+    def run():
+        count = ref(0)
+        seen = []
+        effect(lambda: seen.append(count.value))
+        for i in range(1, writes + 1):
+            count.value = i
+        results.append((len(seen), seen[-1]))
+
+    # Switch the threads as often as possible, so that their batches interleave.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert results == [(writes + 1, writes)] * 4
+
+
+# should track into the effect running in the current thread
+def test_track_into_the_effect_running_in_the_current_thread():
+    a = ref(0)
+    b = ref(0)
+    barrier = threading.Barrier(2, timeout=5)
+    runners = {}
+
+    # Both effects are running at the same time when the refs are read.
+    def func_a():
+        barrier.wait()
+        a.value
+        barrier.wait()
+
+    def func_b():
+        barrier.wait()
+        b.value
+        barrier.wait()
+
+    def run(name, fn):
+        runners[name] = effect(fn)
+
+    threads = [threading.Thread(target=run, args=('a', func_a)), threading.Thread(target=run, args=('b', func_b))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(runners['a'].deps) == 1
+    assert len(runners['b'].deps) == 1
+    assert runners['a'] in getattr(a, 'deps')['__REF_VALUE__'].subs
+    assert runners['b'] in getattr(b, 'deps')['__REF_VALUE__'].subs
+
+
+# should collect the effects, computeds and watchers created in the scope
+def test_collect_the_effects_computeds_and_watchers_created_in_the_scope():
+    count = ref(0)
+    effect_calls = 0
+    watch_calls = 0
+    watch_effect_calls = 0
+    cleanup_calls = 0
+
+    def effect_fn():
+        nonlocal effect_calls
+        effect_calls += 1
+        count.value
+
+    def watch_cb():
+        nonlocal watch_calls
+        watch_calls += 1
+
+    def watch_effect_fn(on_cleanup):
+        nonlocal watch_effect_calls
+
+        def cleanup():
+            nonlocal cleanup_calls
+            cleanup_calls += 1
+
+        on_cleanup(cleanup)
+        watch_effect_calls += 1
+        count.value
+
+    scope = effect_scope()
+
+    def setup():
+        effect(effect_fn)
+        watch(count, watch_cb)
+        watch_effect(watch_effect_fn)
+        return computed(lambda: count.value * 2)
+
+    double = scope.run(setup)
+    assert double is not None
+    assert len(scope.effects) == 4
+
+    count.value += 1
+    assert (effect_calls, watch_calls, watch_effect_calls, cleanup_calls) == (2, 1, 2, 1)
+    assert double.value == 2
+
+    scope.stop()
+    assert not scope.active
+    assert len(scope.effects) == 0
+    assert cleanup_calls == 2
+    count.value += 1
+    assert (effect_calls, watch_calls, watch_effect_calls, cleanup_calls) == (2, 1, 2, 2)
+    assert len(getattr(count, 'deps')['__REF_VALUE__'].subs) == 0
+
+
+# should stop the nested scopes unless they are detached
+def test_stop_the_nested_scopes_unless_they_are_detached():
+    count = ref(0)
+    calls = {'nested': 0, 'detached': 0}
+
+    def make_effect(name):
+
+        def fn():
+            calls[name] += 1
+            count.value
+
+        return fn
+
+    scope = effect_scope()
+    nested = None
+    detached = None
+
+    def setup():
+        nonlocal nested, detached
+        assert get_current_scope() is scope
+        nested = effect_scope()
+        nested.run(lambda: effect(make_effect('nested')))
+        detached = effect_scope(detached=True)
+        detached.run(lambda: effect(make_effect('detached')))
+
+    scope.run(setup)
+    assert get_current_scope() is None
+    assert list(scope.scopes) == [nested]
+
+    scope.stop()
+    assert nested is not None and not nested.active
+    assert detached is not None and detached.active
+    count.value += 1
+    assert calls == {'nested': 1, 'detached': 2}
+    detached.stop()
+
+
+# should remove the effects stopped on their own from the scope
+def test_remove_the_effects_stopped_on_their_own_from_the_scope():
+    scope = effect_scope()
+    runner = scope.run(lambda: effect(lambda: None))
+    assert runner is not None
+    assert len(scope.effects) == 1
+    runner.stop()
+    assert len(scope.effects) == 0
+
+
+# should call the callbacks registered by on_scope_dispose
+def test_call_the_callbacks_registered_by_on_scope_dispose():
+    calls = 0
+
+    def on_dispose():
+        nonlocal calls
+        calls += 1
+
+    scope = effect_scope()
+    scope.run(lambda: on_scope_dispose(on_dispose))
+    assert calls == 0
+    scope.stop()
+    assert calls == 1
+    scope.stop()
+    assert calls == 1
+
+    with pytest.warns(RuntimeWarning):
+        on_scope_dispose(on_dispose)
+    with pytest.warns(RuntimeWarning):
+        assert scope.run(lambda: 1) is None
+
+
+# should release the disposed effects
+def test_release_the_disposed_effects():
+    count = ref(0)
+    scope = effect_scope()
+    runner = scope.run(lambda: effect(lambda: count.value))
+    runner_ref = weakref.ref(runner)
+    del runner
+    scope.stop()
+    gc.collect()
+    assert runner_ref() is None
+
+
+# should call the track, trigger and run hooks until they are removed
+def test_call_the_track_trigger_and_run_hooks_until_they_are_removed():
+    state = reactive({'foo': 1})
+    events = []
+    removers = [
+        on_track(lambda e, target, key: events.append(('track', e, to_raw(target), key))),
+        on_trigger(lambda e, target, key: events.append(('trigger', e, to_raw(target), key))),
+        on_effect_run(lambda e: events.append(('run', e))),
+    ]
+    try:
+        runner = effect(lambda: state['foo'])
+        state['foo'] = 2
+    finally:
+        for remove in removers:
+            remove()
+    raw = to_raw(state)
+    assert events == [
+        ('run', runner),
+        ('track', runner, raw, 'foo'),
+        ('trigger', runner, raw, 'foo'),
+        ('run', runner),
+        ('track', runner, raw, 'foo'),
+    ]
+    events.clear()
+    state['foo'] = 3
+    assert events == []
+
+
+# should only call the hooks of an effect for the effect
+def test_only_call_the_hooks_of_an_effect_for_the_effect():
+    count = ref(0)
+    runner = effect(lambda: count.value)
+    other = effect(lambda: count.value)
+    events = []
+    on_trigger(lambda e, target, key: events.append(e), runner)
+    count.value += 1
+    assert events == [runner]
+    # The hook is removed along with the effect.
+    runner.stop()
+    runner_ref = weakref.ref(runner)
+    del events[:], runner
+    gc.collect()
+    assert runner_ref() is None
+    count.value += 1
+    assert events == []
+    other.stop()
+
+
+# should call the track and run hooks of an effect only when it runs
+def test_call_the_track_and_run_hooks_of_an_effect_only_when_it_runs():
+    state = reactive({'foo': 1, 'bar': 1})
+    runner = effect(lambda: state['foo'])
+    other = effect(lambda: state['bar'])
+    events = []
+    remove_track = on_track(lambda e, target, key: events.append(('track', key)), runner)
+    on_effect_run(lambda e: events.append(('run', e)), runner)
+    state['bar'] = 2
+    assert events == []
+    state['foo'] = 2
+    assert events == [('run', runner), ('track', 'foo')]
+    remove_track()
+    events.clear()
+    runner()
+    assert events == [('run', runner)]
+    runner.stop()
+    other.stop()
+
+
+# should record the runs of the effects while profiling
+def test_record_the_runs_of_the_effects_while_profiling():
+    original_run = ReactiveEffect.run
+    state = reactive({'foo': 1, 'bar': 1})
+
+    def cheap():
+        return state['foo']
+
+    def expensive():
+        return state['foo'] + state['bar'] + sum(range(10000))
+
+    enable_profiling()
+    try:
+        cheap_runner = effect(cheap)
+        expensive_runner = effect(expensive)
+        state['bar'] = 2
+        state['bar'] = 3
+        state['foo'] = 2
+    finally:
+        disable_profiling()
+    assert ReactiveEffect.run is original_run
+    state['foo'] = 3
+    top = stats(1)
+    assert len(top) == 1
+    assert top[0].id == expensive_runner.id
+    assert top[0].name.endswith('expensive')
+    assert top[0].runs == 4
+    assert top[0].deps == 2
+    assert top[0].max_time <= top[0].total_time
+    assert top[0].triggers == {('dict', 'bar'): 2, ('dict', 'foo'): 1}
+    assert [item.id for item in stats()] == [expensive_runner.id, cheap_runner.id]
+
+    with pytest.raises(ValueError):
+        enable_profiling(0)
+
+
+# should not count the changes skipped by the effects while profiling
+def test_not_count_the_changes_skipped_by_the_effects_while_profiling():
+    state = reactive({'foo': 1, 'bar': 1})
+    positive = computed(lambda: state['foo'] > 0)
+    enable_profiling()
+    try:
+        runner = effect(lambda: (positive.value, state['bar']))
+        # The computed is unchanged, so the effect is skipped.
+        state['foo'] = 2
+        runner()
+        state['bar'] = 2
+    finally:
+        disable_profiling()
+    runner_stats = next(item for item in stats() if item.id == runner.id)
+    assert runner_stats.runs == 3
+    assert runner_stats.triggers == {('dict', 'bar'): 1}
+
+
+# should snapshot the dependency graph
+def test_snapshot_the_dependency_graph():
+    state = reactive({'foo': 1, 'bar': 1})
+    count = ref(1)
+    plus = computed(lambda: count.value + state['foo'])
+    runners = [effect(lambda: state['foo'] + plus.value) for _ in range(3)]
+    stop = watch(lambda: state['bar'], lambda: None)
+
+    graph = get_dependency_graph()
+    target_ids = (id(state), id(count), id(plus))
+    sources = {(node.type, node.key): node for node in graph.sources.values() if node.target_id in target_ids}
+    foo = sources[('dict', 'foo')]
+    assert foo.kind == 'reactive'
+    assert foo.fan_out == 4
+    assert sources[('dict', 'bar')].fan_out == 1
+    assert sources[('RefImpl', '')].kind == 'ref'
+    plus_node = sources[('ComputedRefImpl', '')]
+    assert plus_node.kind == 'computed'
+    assert plus_node.fan_out == 3
+    kinds = {node.kind for node in graph.effects.values()}
+    assert {'effect', 'computed', 'watcher'} <= kinds
+    assert graph.hot_sources(1)[0].fan_out >= 4
+    computed_node = next(node for node in graph.effects.values() if node.kind == 'computed' and
+                         (node.id, plus_node.id) in graph.edges)
+    assert computed_node.fan_in == 2
+    assert (foo.id, computed_node.id) in graph.edges
+    assert graph.stats()['max_fan_out'] >= 4
+    assert json.loads(graph.to_json())['stats'] == graph.stats()
+    dot = graph.to_dot()
+    assert dot.startswith('digraph')
+    assert f'{foo.id} -> {computed_node.id};' in dot
+
+    for runner in runners:
+        runner.stop()
+    stop()
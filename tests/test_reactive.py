@@ -1,4 +1,10 @@
-from reactivity import (computed, deep_to_raw, effect, is_reactive, is_ref, mark_raw, reactive, ref, to_raw)
+import gc
+import weakref
+
+import pytest
+
+from reactivity import (computed, deep_to_raw, effect, is_reactive, is_readonly, is_ref, mark_raw, memory_report,
+                        reactive, readonly, ref, shallow_reactive, shallow_readonly, to_raw)
 
 
 # Dict
@@ -225,6 +231,30 @@ def test_should_not_observe_objects_with__REACTIVE_SKIP__():
     assert is_reactive(observed) == False
 
 
+# should not observe objects whose class has __REACTIVE_SKIP__ or is callable
+def test_not_observe_objects_whose_class_has__REACTIVE_SKIP__or_is_callable():
+
+    class Skipped:
+        __REACTIVE_SKIP__ = True
+
+    class Callable:
+
+        def __call__(self):
+            return 1
+
+    class Plain:
+        pass
+
+    assert is_reactive(reactive(Skipped())) == False
+    assert is_reactive(reactive(Callable())) == False
+    assert is_reactive(reactive(Plain())) == True
+    # The instances of the same class are still checked one by one.
+    plain = Plain()
+    setattr(plain, '__REACTIVE_SKIP__', True)
+    assert is_reactive(reactive(plain)) == False
+    assert is_reactive(reactive(ref(1))) == False
+
+
 # deep_to_raw
 def test_deep_to_raw():
     a = {'foo': 1}
@@ -256,3 +286,441 @@ def test_compared_with_blank_value():
     # FrozenSet
     assert reactive(frozenset()) != reactive(frozenset({1, 2, 3}))
     assert reactive(frozenset({1, 2, 3})) != reactive(frozenset())
+
+
+# should release the reactive object when it is no longer referenced
+def test_release_the_reactive_object_when_it_is_no_longer_referenced():
+
+    class Foo:
+
+        def __init__(self):
+            self.bar = 1
+
+    original = Foo()
+    observed = reactive(original)
+    observed_ref = weakref.ref(observed)
+    runner = effect(lambda: observed.bar)
+    runner.stop()
+    del runner, observed
+    gc.collect()
+    assert observed_ref() is None
+    assert to_raw(reactive(original)) is original
+
+
+# should not keep the classes of the objects checked alive
+def test_not_keep_the_classes_of_the_objects_checked_alive():
+
+    class Foo:
+        __REACTIVE_SKIP__ = True
+
+    foo = Foo()
+    assert reactive(foo) is foo
+    assert is_readonly(foo) == False
+    foo_class_ref = weakref.ref(Foo)
+    del foo, Foo
+    gc.collect()
+    assert foo_class_ref() is None
+
+
+# should keep the nested reactive objects alive while effects depend on them
+def test_keep_the_nested_reactive_objects_alive_while_effects_depend_on_them():
+    state = reactive({'nested': {'foo': 1}})
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        dummy = state['nested']['foo']
+
+    effect(func)
+    gc.collect()
+    state['nested']['foo'] = 2
+    assert dummy == 2
+
+
+# should reuse the nested reactive objects until their keys are changed
+def test_reuse_the_nested_reactive_objects_until_their_keys_are_changed():
+    state = reactive({'nested': {'foo': 1}})
+    nested_ref = weakref.ref(state['nested'])
+    gc.collect()
+    assert nested_ref() is state['nested']
+    assert nested_ref() is state.get('nested')
+
+    state['nested'] = {'foo': 2}
+    gc.collect()
+    assert nested_ref() is None
+    assert state['nested']['foo'] == 2
+
+
+# should not keep the objects marked as raw alive
+def test_not_keep_the_objects_marked_as_raw_alive():
+
+    class Foo:
+        pass
+
+    foo = mark_raw(Foo())
+    foo_ref = weakref.ref(foo)
+    assert reactive(foo) is foo
+
+    marked_raw = memory_report()['marked_raw']
+    for _ in range(1000):
+        mark_raw({})
+    held = mark_raw({'foo': 1})
+    assert memory_report()['marked_raw'] - marked_raw < 1000
+    assert reactive({'held': held})['held'] is held
+
+    del foo
+    gc.collect()
+    assert foo_ref() is None
+
+
+# should only make the top level of a shallow reactive object reactive
+def test_only_make_the_top_level_of_a_shallow_reactive_object_reactive():
+    nested = {'bar': 1}
+    count = ref(1)
+    original = {'foo': nested, 'count': count}
+    observed = shallow_reactive(original)
+    assert is_reactive(observed) == True
+    assert shallow_reactive(original) is observed
+    assert reactive(original) is not observed
+    assert to_raw(observed) is original
+    assert observed['foo'] is nested
+    assert observed.get('count') is count
+    assert list(observed.values()) == [nested, count]
+
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        dummy = observed['foo']['bar']
+
+    effect(func)
+    observed['foo']['bar'] = 2
+    assert dummy == 1
+    observed['foo'] = {'bar': 3}
+    assert dummy == 3
+    # The reactive object of the same original object triggers the same effects.
+    reactive(original)['foo'] = {'bar': 4}
+    assert dummy == 4
+
+
+# should reject the mutations of a readonly object and its nested objects
+def test_reject_the_mutations_of_a_readonly_object_and_its_nested_objects():
+    original = {'foo': 1, 'nested': {'bar': [1]}, 'count': ref(1)}
+    observed = readonly(original)
+    assert is_readonly(observed) == True
+    assert is_reactive(observed) == False
+    assert readonly(original) is observed
+    assert to_raw(observed) is original
+    assert observed['foo'] == 1
+    assert observed['count'] == 1
+    assert is_readonly(observed['nested']) == True
+    assert is_readonly(observed.get('nested', {})['bar']) == True
+    assert observed['nested']['bar'][0] == 1
+    with pytest.raises(TypeError):
+        observed['foo'] = 2
+    with pytest.raises(TypeError):
+        del observed['foo']
+    with pytest.raises(TypeError):
+        observed.update({'foo': 2})
+    with pytest.raises(TypeError):
+        observed['nested']['bar'].append(2)
+    assert original == {'foo': 1, 'nested': {'bar': [1]}, 'count': original['count']}
+
+
+# should make the items iterated over or copied out of a readonly object readonly
+def test_make_the_items_iterated_over_or_copied_out_of_a_readonly_object_readonly():
+    nested = {'foo': 1}
+    observed = readonly({'nested': nested, 'items': [nested]})
+    assert all(is_readonly(value) for value in observed.values())
+    assert all(is_readonly(value) for _, value in observed.items())
+    assert is_readonly(observed.copy()['nested']) == True
+    assert list(observed) == ['nested', 'items']
+
+    items = observed['items']
+    assert all(is_readonly(item) for item in items)
+    assert all(is_readonly(item) for item in reversed(items))
+    assert all(is_readonly(item) for item in items.copy())
+    with pytest.raises(TypeError):
+        next(iter(items))['foo'] = 2
+    assert nested == {'foo': 1}
+
+    assert not any(is_readonly(item) for item in shallow_readonly([nested]))
+
+
+# should make the values of the refs read out of a readonly object readonly
+def test_make_the_values_of_the_refs_read_out_of_a_readonly_object_readonly():
+
+    class Foo:
+
+        def __init__(self) -> None:
+            self.r = ref({'x': 1})
+
+    original = {'r': ref({'x': 1})}
+    observed = readonly(original)
+    with pytest.raises(TypeError):
+        observed['r']['x'] = 5  # type: ignore
+    foo = readonly(Foo())
+    with pytest.raises(TypeError):
+        foo.r['x'] = 5  # type: ignore
+    assert original['r'].value == {'x': 1}
+    assert foo.r == {'x': 1}
+
+
+# should wrap the refs read out of a readonly list in readonly refs
+def test_wrap_the_refs_read_out_of_a_readonly_list_in_readonly_refs():
+    r = ref({'x': 1})
+    observed = readonly([r])
+    item = observed[0]
+    assert is_ref(item) == True
+    assert is_readonly(item) == True
+    with pytest.raises(AttributeError):
+        item.value = {'x': 2}
+    with pytest.raises(TypeError):
+        item.value['x'] = 2
+    assert all(is_readonly(item) and is_ref(item) for item in observed)
+    assert r.value == {'x': 1}
+    # The readonly ref still reads the ref, so the changes made through the ref are seen and tracked.
+    dummy = None
+
+    def read():
+        nonlocal dummy
+        dummy = readonly(reactive([r]))[0].value['x']
+
+    effect(read)
+    r.value['x'] = 3
+    assert dummy == 3
+
+
+# should reject setting the attributes of a readonly object
+def test_reject_setting_the_attributes_of_a_readonly_object():
+
+    class Foo:
+
+        def __init__(self) -> None:
+            self.bar = 1
+
+        @property
+        def double(self) -> int:
+            return self.bar * 2
+
+        def increase(self) -> None:
+            self.bar += 1
+
+    observed = readonly(Foo())
+    assert isinstance(observed, Foo)
+    assert observed.bar == 1
+    assert observed.double == 2
+    with pytest.raises(AttributeError):
+        observed.bar = 2
+    with pytest.raises(AttributeError):
+        observed.increase()
+    with pytest.raises(AttributeError):
+        del observed.bar
+    assert to_raw(observed).bar == 1
+
+
+# should not track the reads of a readonly object of a plain object
+def test_not_track_the_reads_of_a_readonly_object_of_a_plain_object():
+    original = {'foo': 1}
+    observed = readonly(original)
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        dummy = observed['foo']
+
+    runner = effect(func)
+    assert dummy == 1
+    assert runner.deps == {}
+
+
+# should track the reads of a readonly object of a reactive object
+def test_track_the_reads_of_a_readonly_object_of_a_reactive_object():
+    state = reactive({'foo': 1, 'nested': {'bar': 1}})
+    observed = readonly(state)
+    assert is_readonly(observed) == True
+    assert is_reactive(observed) == True
+    assert readonly(state) is observed
+    assert readonly(observed) is observed
+    assert to_raw(observed) is to_raw(state)
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        dummy = observed['foo'] + observed['nested']['bar']
+
+    effect(func)
+    assert dummy == 2
+    state['foo'] = 2
+    assert dummy == 3
+    state['nested']['bar'] = 2
+    assert dummy == 4
+    with pytest.raises(TypeError):
+        observed['nested']['bar'] = 3
+
+
+# should only make the top level of a shallow readonly object readonly
+def test_only_make_the_top_level_of_a_shallow_readonly_object_readonly():
+    nested = {'bar': 1}
+    observed = shallow_readonly({'foo': nested})
+    assert is_readonly(observed) == True
+    assert observed['foo'] is nested
+    assert list(observed.values()) == [nested]
+    observed['foo']['bar'] = 2
+    assert nested['bar'] == 2
+    with pytest.raises(TypeError):
+        observed['foo'] = {}
+
+
+# should only patch the methods which the original class has
+def test_only_patch_the_methods_which_the_original_class_has():
+
+    class Foo:
+        pass
+
+    observed = reactive(Foo())
+    assert callable(observed) == False
+    assert '__or__' not in type(observed).__dict__
+    assert '__len__' not in type(observed).__dict__
+    assert len(reactive([1, 2])) == 2
+
+
+# should read the callable instance attributes and the inherited properties of a reactive object
+def test_read_the_callable_instance_attributes_and_the_inherited_properties_of_a_reactive_object():
+
+    class Base:
+        count: int
+
+        @property
+        def doubled(self) -> int:
+            return self.count * 2
+
+    class Foo(Base):
+
+        def __init__(self) -> None:
+            self.count = 1
+            self.callback = len
+
+    observed = reactive(Foo())
+    assert observed.callback is len
+    dummy = None
+
+    def func():
+        nonlocal dummy
+        dummy = observed.doubled
+
+    effect(func)
+    assert dummy == 2
+    observed.count = 2
+    assert dummy == 4
+
+
+# should report the objects held by the reactivity layer
+def test_report_the_objects_held_by_the_reactivity_layer():
+    gc.collect()
+    before = memory_report()
+    state = reactive({'foo': {'bar': 1}})
+    view = readonly(state)
+    runner = effect(lambda: state['foo']['bar'])
+    stopped = effect(lambda: state['foo'])
+    stopped.stop()
+    report = memory_report()
+    assert report['proxies']['reactive'] - before['proxies']['reactive'] == 2
+    assert report['proxies']['readonly'] - before['proxies']['readonly'] == 1
+    assert report['deps'] - before['deps'] == 2
+    assert report['subscriptions'] - before['subscriptions'] == 2
+    assert report['active_effects'] - before['active_effects'] == 1
+    assert report['stopped_effects'] - before['stopped_effects'] == 1
+    assert report['bytes']['total'] > before['bytes']['total']
+    assert report['bytes']['total'] == sum(size for name, size in report['bytes'].items() if name != 'total')
+
+    runner.stop()
+    del state, view, runner, stopped
+    gc.collect()
+    after = memory_report()
+    assert after['proxies'] == before['proxies']
+    assert after['effects'] == before['effects']
+
+
+# should support the equals option of reactive objects
+def test_support_equals_option_of_reactive_objects():
+    state = reactive({'items': [1, 2], 'count': 1})
+    by_eq = reactive({'items': [1, 2]}, equals='eq')
+    by_never = shallow_reactive({'count': 1}, equals='never')
+    calls = {'state': 0, 'by_eq': 0, 'by_never': 0}
+
+    def spy(name, observed):
+        calls[name] += 1
+        return observed.get('items'), observed.get('count')
+
+    effect(lambda: spy('state', state))
+    effect(lambda: spy('by_eq', by_eq))
+    effect(lambda: spy('by_never', by_never))
+    state['count'] = 1
+    state['items'] = [1, 2]
+    by_eq['items'] = [1, 2]
+    by_never['count'] = 1
+    assert calls == {'state': 2, 'by_eq': 1, 'by_never': 2}
+    # The option is shared by all the users of the object, so another option than the one set is rejected.
+    assert reactive(to_raw(by_eq), equals='eq') is by_eq
+    with pytest.raises(ValueError):
+        reactive(by_eq, equals='never')
+    with pytest.raises(ValueError):
+        reactive(to_raw(by_never), equals='eq')
+    # The option can be set on an object which is already reactive with the default one.
+    assert reactive(to_raw(state), equals='eq') is state
+    state['items'] = [1, 2]
+    assert calls['state'] == 2
+
+
+# should keep the equals option of an object regardless of its reactive objects
+def test_keep_equals_option_of_object_regardless_of_its_reactive_objects():
+    original = {'child': {'items': [1, 2]}}
+    child = original['child']
+    calls = 0
+
+    def spy(observed):
+        nonlocal calls
+        calls += 1
+        return observed['items']
+
+    # The reactive object of the child is created (and kept by its parent) before the option is set.
+    parent = reactive(original)
+    parent['child']
+    observed = reactive(child, equals='eq')
+    runner = effect(lambda: spy(observed))
+    observed['items'] = [1, 2]
+    assert calls == 1
+    # The option outlives the reactive objects of the object.
+    observed_ref = weakref.ref(observed)
+    runner.stop()
+    del runner, observed, parent
+    gc.collect()
+    assert observed_ref() is None
+    observed = reactive(child)
+    effect(lambda: spy(observed))
+    observed['items'] = [1, 2]
+    assert calls == 2
+    observed['items'] = [3]
+    assert calls == 3
+
+
+# should support the equals option of reactive objects for attributes
+def test_support_equals_option_of_reactive_objects_for_attributes():
+
+    class Point:
+
+        def __init__(self) -> None:
+            self.coords = (1, 2)
+
+    point = reactive(Point(), equals='never')
+    calls = 0
+
+    def spy():
+        nonlocal calls
+        calls += 1
+        point.coords
+
+    effect(spy)
+    point.coords = (1, 2)
+    assert calls == 2
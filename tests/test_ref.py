@@ -1,4 +1,7 @@
-from reactivity import (computed, deep_unref, effect, is_ref, reactive, ref, unref)
+import pytest
+
+from reactivity import (computed, deep_unref, effect, is_computed_ref, is_reactive, is_ref, reactive, ref, shallow_ref,
+                        trigger_ref, unref)
 
 
 # should hold a value
@@ -188,3 +191,158 @@ def test_deep_unref():
     assert 'Ref' in str(type(a[0].value['bar'][0]))  # type: ignore
     assert 'Ref' not in str(type(deep_unref(a)[0]['bar'][0]))  # type: ignore
     assert str(deep_unref(a)) == '[{\'bar\': [1]}]'
+
+
+# should check the flags without running the attribute hooks of the object
+def test_check_the_flags_without_running_the_attribute_hooks_of_the_object():
+    calls = []
+
+    class Dynamic:
+
+        def __getattr__(self, name: str):
+            calls.append(name)
+            return True
+
+    obj = Dynamic()
+    assert is_ref(obj) == False
+    assert is_computed_ref(obj) == False
+    assert is_reactive(obj) == False
+    assert calls == []
+    assert is_ref(ref(1)) == True
+    assert is_ref(computed(lambda: 1)) == True
+    assert is_computed_ref(computed(lambda: 1)) == True
+
+
+# should not make the value of a shallow ref reactive
+def test_not_make_the_value_of_a_shallow_ref_reactive():
+    payload = {'foo': {'bar': 1}}
+    sref = shallow_ref(payload)
+    assert sref.value is payload
+    assert is_reactive(sref.value) == False
+    assert shallow_ref(sref) is sref
+
+
+# should only trigger on replacing the value of a shallow ref, or by trigger_ref
+def test_only_trigger_on_replacing_the_value_of_a_shallow_ref_or_by_trigger_ref():
+    sref = shallow_ref({'count': 1})
+    dummy = None
+    calls = 0
+
+    def spy():
+        nonlocal dummy, calls
+        calls += 1
+        dummy = sref.value['count']
+
+    effect(spy)
+    assert dummy == 1
+    sref.value['count'] = 2
+    assert dummy == 1
+    assert calls == 1
+    trigger_ref(sref)
+    assert dummy == 2
+    assert calls == 2
+    sref.value = {'count': 3}
+    assert dummy == 3
+    assert calls == 3
+
+
+# should compare the values of a ref by identity first, and not with == if they are containers
+def test_compare_values_of_ref_by_identity_first_and_not_with_eq_if_they_are_containers():
+    r = ref([1, 2, 3])
+    calls = 0
+
+    def spy():
+        nonlocal calls
+        calls += 1
+        r.value
+
+    effect(spy)
+    r.value = r.value
+    assert calls == 1
+    r.value = [1, 2, 3]
+    assert calls == 2
+    num = ref(1)
+    effect(lambda: num.value)
+    num.value = 1.0  # type: ignore
+    assert num.value == 1
+
+
+class Ambiguous:
+
+    def __eq__(self, other: object) -> bool:
+        raise ValueError('The truth value is ambiguous.')
+
+
+# should support the equals option of refs
+def test_support_equals_option_of_refs():
+    calls = {'identity': 0, 'eq': 0, 'never': 0, 'custom': 0}
+    refs = {
+        'identity': ref(1000, equals='identity'),
+        'eq': ref([1, 2], equals='eq'),
+        'never': ref(1, equals='never'),
+        'custom': ref(1.0, equals=lambda value, old_value: abs(value - old_value) < 0.5),
+    }
+    for name, r in refs.items():
+
+        def spy(name=name, r=r):
+            calls[name] += 1
+            r.value
+
+        effect(spy)
+    refs['identity'].value = int('1000')
+    refs['eq'].value = [1, 2]
+    refs['never'].value = 1
+    refs['custom'].value = 1.2
+    assert calls == {'identity': 2, 'eq': 1, 'never': 2, 'custom': 1}
+    refs['custom'].value = 2.0
+    assert calls['custom'] == 2
+    sref = shallow_ref({'count': 1}, equals='eq')
+    sref_calls = 0
+
+    def sref_spy():
+        nonlocal sref_calls
+        sref_calls += 1
+        return sref.value
+
+    effect(sref_spy)
+    sref.value = {'count': 1}
+    assert sref.value == {'count': 1}
+    assert sref_calls == 1
+    sref.value = {'count': 2}
+    assert sref_calls == 2
+
+
+# should treat the values failing to compare as changed
+def test_treat_values_failing_to_compare_as_changed():
+    r = ref(Ambiguous())
+    calls = 0
+
+    def spy():
+        nonlocal calls
+        calls += 1
+        r.value
+
+    effect(spy)
+    r.value = Ambiguous()
+    assert calls == 2
+
+
+# should reject unknown equality strategies
+def test_reject_unknown_equality_strategies():
+    with pytest.raises(ValueError):
+        ref(1, equals='deep')
+    with pytest.raises(TypeError):
+        ref(1, equals=1)  # type: ignore
+    with pytest.raises(ValueError):
+        reactive({}, equals='deep')
+
+
+# should reject the equals option along with an existing ref
+def test_reject_equals_option_along_with_existing_ref():
+    r = ref(1)
+    assert ref(r) is r
+    assert shallow_ref(r) is r
+    with pytest.raises(ValueError):
+        ref(r, equals='eq')
+    with pytest.raises(ValueError):
+        shallow_ref(r, equals='never')
@@ -1,5 +1,8 @@
+import threading
+import time
+
 import pytest
-from reactivity import watch, watch_effect, reactive, ref, computed
+from reactivity import computed, flush_jobs, reactive, ref, watch, watch_effect
 
 
 # effect
@@ -551,3 +554,147 @@ def test_should_watch_the_change_when_assigning_a_blank_value():
     watch(e, cb_e)
     e.value = frozenset()
     assert cb_e_calls == 1
+
+
+# flush: pre and post jobs run when flushed
+def test_flush_pre_and_post_jobs_run_when_flushed():
+    count = ref(0)
+    calls = []
+
+    def pre_cb(value):
+        calls.append(('pre', value))
+
+    def post_cb(value):
+        calls.append(('post', value))
+
+    def sync_cb(value):
+        calls.append(('sync', value))
+
+    watch(count, post_cb, flush='post')
+    watch(count, pre_cb, flush='pre')
+    watch(count, sync_cb)
+
+    count.value += 1
+    count.value += 1
+    assert calls == [('sync', 1), ('sync', 2)]
+
+    flush_jobs()
+    assert calls == [('sync', 1), ('sync', 2), ('pre', 2), ('post', 2)]
+
+    # nothing is queued anymore
+    flush_jobs()
+    assert len(calls) == 4
+
+
+# flush: jobs run in the order of creation
+def test_flush_jobs_run_in_the_order_of_creation():
+    a = ref(0)
+    b = ref(0)
+    calls = []
+
+    def first():
+        calls.append(('first', b.value))
+
+    def second():
+        calls.append(('second', a.value))
+
+    watch_effect(first, flush='pre')
+    watch_effect(second, flush='pre')
+    assert calls == [('first', 0), ('second', 0)]
+
+    # second is triggered before first, but first was created first
+    a.value += 1
+    b.value += 1
+    flush_jobs()
+    assert calls == [('first', 0), ('second', 0), ('first', 1), ('second', 1)]
+
+
+# flush: stopped watchers are not flushed
+def test_flush_stopped_watchers_are_not_flushed():
+    count = ref(0)
+    calls = 0
+
+    def cb():
+        nonlocal calls
+        calls += 1
+
+    stop = watch(count, cb, flush='post')
+    count.value += 1
+    stop()
+    flush_jobs()
+    assert calls == 0
+
+
+# flush: wait for the flush in progress in another thread
+def test_flush_wait_for_the_flush_in_progress_in_another_thread():
+    a = ref(0)
+    b = ref(0)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_cb():
+        started.set()
+        release.wait(5)
+
+    watch(a, slow_cb, flush='pre')
+    watch(b, lambda value: calls.append(value), flush='pre')
+
+    a.value += 1
+    flusher = threading.Thread(target=flush_jobs)
+    flusher.start()
+    assert started.wait(5)
+
+    def flush_own_jobs():
+        b.value += 1
+        flush_jobs()
+        calls.append('flushed')
+
+    waiter = threading.Thread(target=flush_own_jobs)
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    flusher.join()
+    waiter.join()
+    # The job queued by the waiting thread has run when its flush_jobs() returns.
+    assert calls == [1, 'flushed']
+
+
+# warn invalid flush option
+def test_warn_invalid_flush_option():
+    with pytest.raises(ValueError, match='Invalid flush option'):
+        watch(ref(0), lambda: None, flush='never')
+    with pytest.raises(ValueError, match='Invalid flush option'):
+        watch_effect(lambda: None, flush='never')
+
+
+# should watch the objects nested in lists deeply
+def test_watch_the_objects_nested_in_lists_deeply():
+    state = reactive({'items': [{'value': 0}, {'value': 0}]})
+    calls = 0
+
+    def cb():
+        nonlocal calls
+        calls += 1
+
+    watch(state, cb, deep=True)
+    state['items'][1]['value'] += 1
+    assert calls == 1
+
+
+# should watch the objects nested in nested lists deeply
+def test_watch_the_objects_nested_in_nested_lists_deeply():
+    state = reactive({'matrix': [[{'value': 0}], [{'value': 0}]]})
+    calls = 0
+
+    def cb():
+        nonlocal calls
+        calls += 1
+
+    watch(state, cb, deep=True)
+    state['matrix'][1][0]['value'] += 1
+    assert calls == 1
+    state['matrix'][0].append({'value': 0})
+    assert calls == 2
+    state['matrix'][0][1]['value'] += 1
+    assert calls == 3